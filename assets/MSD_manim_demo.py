@@ -6,136 +6,215 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from quera_colors import *
 from quera_qubit_lib import *
+from vector_qubit_array import VectorQubitArray
+from aod_planner import plan_separable
+from rearrangement import row_sort_plan, sample_loading
+from segment_cache import SegmentCacheMixin
+from mobject_census import MobjectCensusMixin
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
+from stabilizer import (
+    StabilizerTableau,
+    STATE_ZERO,
+    STATE_ONE,
+    STATE_PLUS,
+    STATE_MINUS,
+    STATE_ENTANGLED,
+)
 
 USE_TWEEZERS = False  # Toggle laser tweezer visuals ON or OFF
+# Tweezers pick up per-atom mobjects; without them all atoms live in one array
+ARRAY_CLASS = QubitArray if USE_TWEEZERS else VectorQubitArray
+GRID_ROWS, GRID_COLS = 5, 17
+
+# Qubit shading by stabilizer state
+STATE_COLORS = {
+    STATE_ZERO: BLUE,
+    STATE_ONE: RED,
+    STATE_PLUS: GREEN,
+    STATE_MINUS: YELLOW,
+    STATE_ENTANGLED: PURPLE,
+}
+
+class MSDScene(
+    ProfiledSceneMixin, MobjectCensusMixin, TimedSceneMixin, SegmentCacheMixin, Scene
+):
+    # Phases the render profiler times (see render_profiler.py)
+    profiled_methods = (
+        "construct", "perform_swap_cycle", "perform_row_swap_cycle", "apply_clifford_layer",
+    )
 
-class MSDScene(Scene):
     def construct(self):
-        array = QubitArray(
+        array = ARRAY_CLASS(
             layout="grid",
-            rows=5, cols=17,
+            rows=GRID_ROWS, cols=GRID_COLS,
             qubit_spacing=0.7,
             use_vacancies=True,
             fill_pattern="all"
         )
         self.add(array)
+        # Clifford state of every atom, shaded onto the array
+        self.tableau = StabilizerTableau(len(array.qubits))
+        self.shade_qubit_states(array)
+        self.wait(0.1)
+        # Every atom starts in |+>, so the CZ of each swap cycle entangles it
+        atoms = list(range(len(array.qubits)))
+        self.apply_clifford_layer(array, [("SY", atoms)])
         self.wait(0.1)
 
         # --- COLUMN‐BASED TRAPEZOIDAL SWAPS (can comment out for speed) ---
-        source_cols = [
-            [1, 10, 12, 13],
-            [4, 8, 11, 15],
-            [2, 8, 9, 10, 14],
-            [0, 3, 5, 10, 11],
-            [0, 2, 4, 6, 8, 12],
+        # One {source col: target col} layout per round, compiled into AOD-legal cycles
+        column_rounds = [
+            {1: 3, 10: 7, 12: 14, 13: 16},
+            {4: 7, 8: 10, 11: 14, 15: 16},
+            {2: 4, 8: 6, 9: 7, 10: 13, 14: 16},
+            {0: 2, 3: 6, 5: 8, 10: 12, 11: 13},
+            {0: 1, 2: 3, 4: 5, 6: 7, 8: 9, 12: 15},
         ]
-        target_cols = [
-            [3, 7, 14, 16],
-            [7, 10, 14, 16],
-            [4, 6, 7, 13, 16],
-            [2, 6, 8, 12, 13],
-            [1, 3, 5, 7, 9, 15],
-        ]
-        for s_cols, t_cols in zip(source_cols, target_cols):
-            self.perform_swap_cycle(array, s_cols, t_cols)
-            self.wait(0.2)
+        for column_map in column_rounds:
+            (source_cols, target_cols), _ = self.plan_visits(array, columns=column_map)
+            for s_cols, t_cols in zip(source_cols, target_cols):
+                self.perform_swap_cycle(array, s_cols, t_cols)
+                self.wait(0.2)
 
         # --- ROW‐BASED L‐SHAPED SWAPS (only for faster testing) ---
-        source_rows = [[2, 4], [1, 3], [0, 1]]
-        target_rows = [[1, 3], [0, 2], [3, 4]]
-        for s_rows, t_rows in zip(source_rows, target_rows):
-            self.perform_row_swap_cycle(array, s_rows, t_rows)
-            self.wait(0.2)
+        row_rounds = [{2: 1, 4: 3}, {1: 0, 3: 2}, {0: 3, 1: 4}]
+        for row_map in row_rounds:
+            _, (source_rows, target_rows) = self.plan_visits(array, rows=row_map)
+            for s_rows, t_rows in zip(source_rows, target_rows):
+                self.perform_row_swap_cycle(array, s_rows, t_rows)
+                self.wait(0.2)
 
-    def perform_swap_cycle(self, array, source_cols, target_cols):
-        """Column‐based trapezoidal swaps with optional tweezers."""
+        # Rotate back to the Z basis for readout
+        self.apply_clifford_layer(array, [("-SY", atoms)])
+        self.wait(0.1)
+
+    def plan_visits(self, array, columns=None, rows=None):
+        """
+        AOD cycles for the layout where every atom of a key column (row) of
+        `columns` (`rows`) visits its value. Returns plan_separable's
+        ((source_cols, target_cols), (source_rows, target_rows)); raises
+        ValueError if the layout can't be split into column and row moves.
+        Layouts that move atoms one by one go through row_sort_plan instead,
+        as in RearrangementScene.
+        """
+        sites = self.lattice_sites(array)
+        targets = sites.copy()
+        for axis, line_map in ((1, columns), (0, rows)):
+            if line_map:
+                targets[:, axis] = [line_map.get(line, line) for line in sites[:, axis].tolist()]
+        return plan_separable(sites, targets)
+
+    def apply_clifford_layer(self, array, gates):
+        """
+        Applies [(type, [qubits]), ...] (SY, -SY, H, X, CZ, CNOT, M) to the
+        tableau and reshades the array.
+        """
+        for gtype, qubits in gates:
+            self.tableau.apply_gate(gtype, qubits)
+        self.shade_qubit_states(array)
+
+    def entangle_with_sites(self, array, atoms, rows, cols):
+        """CZ between each of `atoms` and the atom on site (rows[i], cols[i]) it is parked at."""
+        occupant = {tuple(site): idx for idx, site in enumerate(self.lattice_sites(array).tolist())}
+        gates = [
+            ("CZ", [int(atom), occupant[site]])
+            for atom, site in zip(atoms, zip(np.asarray(rows).tolist(), np.asarray(cols).tolist()))
+            if site in occupant
+        ]
+        self.apply_clifford_layer(array, gates)
+
+    def shade_qubit_states(self, array):
+        colors = [STATE_COLORS[state] for state in self.tableau.qubit_states()]
+        if isinstance(array, VectorQubitArray):
+            array.set_qubit_colors(colors)
+            return
+        for idx, color in enumerate(colors):
+            array.get_qubit(idx).set_color(color)
+
+    def lattice_sites(self, array):
+        """(row, col) lattice site of every atom."""
+        if isinstance(array, VectorQubitArray):
+            return array.lattice
         spacing = array.qubit_spacing
-        offset = 0.3 * spacing
-        col_map = dict(zip(source_cols, target_cols))
+        positions = np.array([pos for _, pos in array.qubits])
+        return np.rint(np.column_stack([
+            (GRID_ROWS - 1) / 2 - positions[:, 1] / spacing,
+            positions[:, 0] / spacing + (GRID_COLS - 1) / 2,
+        ])).astype(int)
 
-        # Identify qubits and prepare tweezers
-        active = []   # list of (idx, src_col)
-        tweezers = []
-        for idx, (q, pos) in enumerate(array.qubits):
-            x, _, _ = pos
-            for col in source_cols:
-                if abs(x - ((col - 8) * spacing)) < 1e-3:
-                    active.append((idx, col))
-                    if USE_TWEEZERS:
-                        tw = DotLaserTweezer().move_to(pos).set_opacity(0)
-                        self.add(tw)
-                        tweezers.append((tw, idx, col))
+    def select_atoms(self, array, columns=None, rows=None):
+        """
+        (atom indices, the column or row each sits in) for every atom in the
+        given lattice columns or rows.
+        """
+        if isinstance(array, VectorQubitArray):
+            if columns is not None:
+                return array.atoms_in_columns(columns)
+            return array.atoms_in_rows(rows)
+
+        # Per-atom QubitArray: scan positions for the grid's lattice lines
+        spacing = array.qubit_spacing
+        if columns is not None:
+            axis, lines = 0, columns
+            coords = (np.asarray(lines) - (GRID_COLS - 1) / 2) * spacing
+        else:
+            axis, lines = 1, rows
+            coords = ((GRID_ROWS - 1) / 2 - np.asarray(lines)) * spacing
+        positions = np.array([pos for _, pos in array.qubits])
+        hits = np.abs(positions[:, axis, None] - coords[None, :]) < 1e-3
+        atoms, line = np.nonzero(hits)
+        return atoms, np.asarray(lines)[line]
 
+    def add_tweezers(self, array, indices, lines):
+        tweezers = []
+        for idx, line in zip(indices, lines):
+            tw = DotLaserTweezer().move_to(array.get_qubit(idx)).set_opacity(0)
+            self.add(tw)
+            tweezers.append((tw, idx, line))
         # Pick up
-        if USE_TWEEZERS:
-            for tw, idx, _ in tweezers:
-                tw.move_to(array.get_qubit(idx))
-            self.play(*[
-                tw.pick_up(array.get_qubit(idx), show=True)[0]
-                for tw, idx, _ in tweezers
-            ], run_time=0.1)
+        self.play(*[
+            tw.pick_up(array.get_qubit(idx), show=True)[0]
+            for tw, idx, _ in tweezers
+        ], run_time=0.1)
+        return tweezers
 
-        # Step 1: DOWN
+    def shift_atoms(self, array, tweezers, indices, deltas, run_time):
+        """Moves the selected atoms by one (3,) delta each, via their tweezers if any."""
+        deltas = np.broadcast_to(deltas, (len(indices), 3))
         if USE_TWEEZERS:
             self.play(*[
-                tw.animate.shift(DOWN * offset)
-                for tw, _, _ in tweezers
-            ], run_time=0.05)
+                tw.animate.shift(delta)
+                for (tw, _, _), delta in zip(tweezers, deltas)
+            ], run_time=run_time)
         else:
-            moves = [(idx, 0, -offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+            array.shift_qubits(self, indices, deltas, run_time=run_time)
 
-        # Step 2: HORIZONTAL
-        if USE_TWEEZERS:
-            h_anims = []
-            for tw, _, src in tweezers:
-                dx = (col_map[src] - src) * spacing - offset
-                h_anims.append(tw.animate.shift(RIGHT * dx))
-            self.play(*h_anims, run_time=0.2)
-        else:
-            moves = []
-            for idx, src in active:
-                dx = (col_map[src] - src) * spacing - offset
-                moves.append((idx, dx, 0))
-            array.move_qubits(self, moves, run_time=0.2, animate=True)
+    def perform_swap_cycle(self, array, source_cols, target_cols):
+        """Column‐based trapezoidal swaps with optional tweezers."""
+        spacing = array.qubit_spacing
+        offset = 0.3 * spacing
+        col_map = np.zeros(max(source_cols) + 1, dtype=int)
+        col_map[source_cols] = target_cols
 
-        # Step 3: UP
-        if USE_TWEEZERS:
-            self.play(*[
-                tw.animate.shift(UP * offset)
-                for tw, _, _ in tweezers
-            ], run_time=0.05)
-        else:
-            moves = [(idx, 0, offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+        # Identify qubits and prepare tweezers
+        active, src = self.select_atoms(array, columns=source_cols)
+        tweezers = self.add_tweezers(array, active, src) if USE_TWEEZERS else []
+        dx = (col_map[src] - src) * spacing - offset
+
+        # Step 1: DOWN, Step 2: HORIZONTAL, Step 3: UP
+        self.shift_atoms(array, tweezers, active, DOWN * offset, run_time=0.05)
+        self.shift_atoms(array, tweezers, active, np.outer(dx, RIGHT), run_time=0.2)
+        self.shift_atoms(array, tweezers, active, UP * offset, run_time=0.05)
 
+        # Parked beside the target column: entangle with its atoms
+        self.entangle_with_sites(array, active, self.lattice_sites(array)[active, 0], col_map[src])
         self.wait(0.1)
 
         # Reverse: DOWN → HORIZONTAL back → UP
-        if USE_TWEEZERS:
-            self.play(*[
-                tw.animate.shift(DOWN * offset)
-                for tw, _, _ in tweezers
-            ], run_time=0.05)
-            rev_h = []
-            for tw, _, src in tweezers:
-                dx = (src - col_map[src]) * spacing + offset
-                rev_h.append(tw.animate.shift(RIGHT * dx))
-            self.play(*rev_h, run_time=0.2)
-            self.play(*[
-                tw.animate.shift(UP * offset)
-                for tw, _, _ in tweezers
-            ], run_time=0.05)
-        else:
-            moves = [(idx, 0, -offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
-            moves = []
-            for idx, src in active:
-                dx = (src - col_map[src]) * spacing + offset
-                moves.append((idx, dx, 0))
-            array.move_qubits(self, moves, run_time=0.2, animate=True)
-            moves = [(idx, 0, offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+        self.shift_atoms(array, tweezers, active, DOWN * offset, run_time=0.05)
+        self.shift_atoms(array, tweezers, active, np.outer(-dx, RIGHT), run_time=0.2)
+        self.shift_atoms(array, tweezers, active, UP * offset, run_time=0.05)
 
         # Release
         if USE_TWEEZERS:
@@ -144,63 +223,66 @@ class MSDScene(Scene):
                 for tw, _, _ in tweezers
             ], run_time=0.1)
 
-
     def perform_row_swap_cycle(self, array, source_rows, target_rows):
         """Row‐based L‐shaped swaps with optional tweezers."""
         spacing = array.qubit_spacing
         offset = 0.3 * spacing
-        row_map = dict(zip(source_rows, target_rows))
+        row_map = np.zeros(max(source_rows) + 1, dtype=int)
+        row_map[source_rows] = target_rows
 
-        active = []    # list of (idx, src_row)
-        tweezers = []
-        for idx, (q, pos) in enumerate(array.qubits):
-            _, y, _ = pos
-            for row in source_rows:
-                if abs(y - ((2 - row) * spacing)) < 1e-3:
-                    active.append((idx, row))
-                    if USE_TWEEZERS:
-                        tw = DotLaserTweezer().move_to(pos).set_opacity(0)
-                        self.add(tw)
-                        tweezers.append((tw, idx, row))
-
-        # Pick up
-        if USE_TWEEZERS:
-            for tw, idx, _ in tweezers:
-                tw.move_to(array.get_qubit(idx))
-            self.play(*[
-                tw.pick_up(array.get_qubit(idx), show=True)[0]
-                for tw, idx, _ in tweezers
-            ], run_time=0.1)
+        active, src = self.select_atoms(array, rows=source_rows)
+        tweezers = self.add_tweezers(array, active, src) if USE_TWEEZERS else []
+        dy = (row_map[src] - src) * -spacing
 
         # Step 1: RIGHT
-        self.play(*[
-            tw.animate.shift(RIGHT * offset)
-            for tw, _, _ in tweezers
-        ], run_time=0.05)
+        self.shift_atoms(array, tweezers, active, RIGHT * offset, run_time=0.05)
 
         # Step 2: VERTICAL
-        v_anims = []
-        for tw, _, src in tweezers:
-            dy = (row_map[src] - src) * -spacing
-            v_anims.append(tw.animate.shift(UP * dy))
-        self.play(*v_anims, run_time=0.2)
+        self.shift_atoms(array, tweezers, active, np.outer(dy, UP), run_time=0.2)
+        # Parked beside the target row: entangle with its atoms
+        self.entangle_with_sites(array, active, row_map[src], self.lattice_sites(array)[active, 1])
         self.wait(0.1)
 
         # Reverse vertical
-        rv = []
-        for tw, _, src in tweezers:
-            dy = (src - row_map[src]) * -spacing
-            rv.append(tw.animate.shift(UP * dy))
-        self.play(*rv, run_time=0.2)
+        self.shift_atoms(array, tweezers, active, np.outer(-dy, UP), run_time=0.2)
 
         # Step 3: LEFT back
-        self.play(*[
-            tw.animate.shift(LEFT * offset)
-            for tw, _, _ in tweezers
-        ], run_time=0.05)
+        self.shift_atoms(array, tweezers, active, LEFT * offset, run_time=0.05)
 
         # Release
-        self.play(*[
-            tw.release(hide=True)[0]
-            for tw, _, _ in tweezers
-        ], run_time=0.1)
+        if USE_TWEEZERS:
+            self.play(*[
+                tw.release(hide=True)[0]
+                for tw, _, _ in tweezers
+            ], run_time=0.1)
+
+
+class RearrangementScene(MSDScene):
+    """Random ~50% loading sorted into a defect-free block, one step per phase."""
+    # None = a fresh random loading on every render
+    loading_seed = None
+
+    def construct(self):
+        occupancy = sample_loading(
+            GRID_ROWS, GRID_COLS, rng=np.random.default_rng(self.loading_seed)
+        )
+        array = VectorQubitArray(
+            layout="grid",
+            rows=GRID_ROWS, cols=GRID_COLS,
+            qubit_spacing=0.7,
+            use_vacancies=True,
+            fill_pattern=occupancy,
+        )
+        steps, (row0, col0, height, width) = row_sort_plan(occupancy)
+
+        # Outline the block the atoms are sorted into
+        spacing = array.qubit_spacing
+        corners = array.site_positions([row0, row0 + height - 1], [col0, col0 + width - 1])
+        target = Rectangle(width * spacing, height * spacing, stroke_color=YELLOW)
+        target.move_to(corners.mean(axis=0))
+
+        self.add(array)
+        self.play(ShowCreation(target), run_time=0.5)
+        for step in steps:
+            array.move_to_sites(self, step.atoms, step.rows, step.cols, run_time=0.5)
+            self.wait(0.2)
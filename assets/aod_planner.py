@@ -0,0 +1,120 @@
+"""
+Compiles column (or row) moves into AOD-legal parallel swap cycles.
+
+An AOD (acousto-optic deflector) moves whole columns of atoms at once, and
+its tones cannot cross: a parallel move is legal when its source lines and
+its target lines are both strictly increasing, i.e. the lines keep their
+order. MSDScene.perform_swap_cycle also parks each moving column next to a
+target column that stays put, so no line may be both a source and a target
+within one cycle.
+
+plan_aod_cycles groups (source, target) moves into as few such cycles as it
+can with patience sorting: moves are dealt in source order onto the pile
+whose last target is the largest one below theirs. Without the parking rule
+this is exactly the minimum (the longest chain of moves that must cross);
+with it, it stays greedy. It runs in O(n log n) for the usual case, so
+arrays with thousands of lines compile in well under a second.
+
+The result is the (source_cols, target_cols) lists perform_swap_cycle and
+perform_row_swap_cycle consume. plan_separable compiles an atom-level
+rearrangement whose column and row moves are independent into both.
+
+Only such separable layouts can be compiled: whole-line moves keep every
+pair of atoms that share a column (or row) in a shared column (row), so a
+general permutation of atoms, one that sends two atoms of a line to
+different lines, has no plan in this format and plan_separable raises
+ValueError for it. Sorting an arbitrary loading into a block moves atoms
+individually instead; use rearrangement.row_sort_plan for that.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+
+def is_aod_legal(sources, targets):
+    """Whether one parallel move of `sources` to `targets` keeps line order."""
+    sources, targets = np.asarray(sources), np.asarray(targets)
+    return bool(
+        len(sources) == len(targets)
+        and (np.diff(sources) > 0).all()
+        and (np.diff(targets) > 0).all()
+        and not np.isin(sources, targets).any()
+    )
+
+
+def permutation_moves(permutation):
+    """(line, permutation[line]) for every line the permutation moves."""
+    permutation = np.asarray(permutation)
+    lines = np.flatnonzero(permutation != np.arange(len(permutation)))
+    return list(zip(lines.tolist(), permutation[lines].tolist()))
+
+
+def plan_aod_cycles(moves):
+    """
+    Groups (source, target) line moves into AOD-legal cycles. Returns
+    (source_lists, target_lists), one pair of sorted lists per cycle.
+    """
+    # Equal sources are dealt with falling targets, so they never share a pile
+    moves = sorted(((int(s), int(t)) for s, t in moves if s != t), key=lambda m: (m[0], -m[1]))
+    tops = []  # last target of each pile, kept sorted
+    piles = []  # [sources, targets, source set, target set, creation order]
+
+    for s, t in moves:
+        i = bisect_left(tops, t) - 1
+        while i >= 0:
+            sources, _, source_set, target_set, _ = piles[i]
+            if sources[-1] != s and s not in target_set and t not in source_set:
+                break
+            i -= 1
+        if i < 0:
+            pile = [[], [], set(), set(), len(piles)]
+        else:
+            tops.pop(i)
+            pile = piles.pop(i)
+        pile[0].append(s)
+        pile[1].append(t)
+        pile[2].add(s)
+        pile[3].add(t)
+        j = bisect_left(tops, t)
+        tops.insert(j, t)
+        piles.insert(j, pile)
+
+    piles.sort(key=lambda pile: pile[4])
+    return [pile[0] for pile in piles], [pile[1] for pile in piles]
+
+
+def plan_permutation(permutation):
+    """AOD cycles moving every line i to permutation[i]."""
+    return plan_aod_cycles(permutation_moves(permutation))
+
+
+def separable_moves(source_sites, target_sites):
+    """
+    Splits an atom-level rearrangement, (row, col) sources to (row, col)
+    targets, into column moves and row moves. Raises ValueError unless every
+    atom of a source column goes to the same target column and no two moving
+    columns share a target, and likewise for rows; anything else can't be
+    done as whole-line AOD moves. (A column may move onto one that stays put:
+    MSDScene parks it alongside.)
+    """
+    source_sites = np.asarray(source_sites, dtype=int).reshape(-1, 2)
+    target_sites = np.asarray(target_sites, dtype=int).reshape(-1, 2)
+    maps = []
+    for axis, name in ((1, "column"), (0, "row")):
+        pairs = np.unique(np.column_stack([source_sites[:, axis], target_sites[:, axis]]), axis=0)
+        if len(np.unique(pairs[:, 0])) != len(pairs):
+            raise ValueError(f"Rearrangement is not separable: a {name} splits across targets")
+        moved = pairs[pairs[:, 0] != pairs[:, 1]]
+        if len(np.unique(moved[:, 1])) != len(moved):
+            raise ValueError(f"Rearrangement is not separable: two {name}s move onto one")
+        maps.append([(s, t) for s, t in pairs.tolist() if s != t])
+    return maps[0], maps[1]
+
+
+def plan_separable(source_sites, target_sites):
+    """
+    ((source_cols, target_cols), (source_rows, target_rows)) for a separable
+    rearrangement; raises ValueError for any other (see separable_moves).
+    """
+    column_moves, row_moves = separable_moves(source_sites, target_sites)
+    return plan_aod_cycles(column_moves), plan_aod_cycles(row_moves)
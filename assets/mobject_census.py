@@ -0,0 +1,142 @@
+"""
+Mobject census and leak detector for long-running scenes.
+
+Every mobject attached to the scene is visited on every frame, so transient
+sparks, spell lines or faded-out copies that are never removed make each
+frame a little slower than the last. Scenes that mix in MobjectCensusMixin
+count the scene's mobjects after every play / wait call when QUERA_CENSUS
+is set:
+
+    QUERA_CENSUS=warn manimgl animation_v2.py QuantumCircuitScene -w
+
+- report: record the live counts and type histograms, summarize at tear_down
+- warn:   also print every top-level mobject that stays invisible (zero
+          opacity or zero size) for `census_grace` play boundaries in a row
+- prune:  like warn, but remove those mobjects from the scene
+
+Set QUERA_CENSUS_REPORT to a .json path to keep the full per-play history.
+"""
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+CENSUS_MODES = ("report", "warn", "prune")
+EPSILON = 1e-6
+
+
+def is_visible(mob):
+    """Whether `mob` itself (not its submobjects) draws anything."""
+    if not mob.has_points():
+        return False
+    if mob.get_width() < EPSILON and mob.get_height() < EPSILON:
+        return False
+    if hasattr(mob, "has_fill") and hasattr(mob, "has_stroke"):  # manimlib VMobject
+        return bool(mob.has_fill() or mob.has_stroke())
+    if hasattr(mob, "get_fill_opacity"):  # manim CE VMobject
+        return mob.get_fill_opacity() > EPSILON or (
+            mob.get_stroke_width() > 0 and mob.get_stroke_opacity() > EPSILON
+        )
+    data = getattr(mob, "data", None)
+    names = getattr(getattr(data, "dtype", None), "names", None) or ()
+    for key in ("opacity", "rgba"):  # manimlib images and point clouds
+        if key in names and len(data):
+            return float(np.max(data[key][:, -1])) > EPSILON
+    return getattr(mob, "fill_opacity", 1) > EPSILON  # manim CE images
+
+
+class MobjectCensusMixin:
+    census_mode = os.environ.get("QUERA_CENSUS")
+    census_report = os.environ.get("QUERA_CENSUS_REPORT")
+    # Play boundaries a mobject must stay invisible before it counts as leaked
+    census_grace = 2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.census_mode not in (None, *CENSUS_MODES):
+            raise ValueError(
+                f"Unknown census mode {self.census_mode!r}, expected one of {CENSUS_MODES}"
+            )
+        self.census_history = []
+        self.census_pruned = 0
+        self._invisible_streaks = {}
+
+    def play(self, *animations, **kwargs):
+        result = super().play(*animations, **kwargs)
+        if self.census_mode:
+            self.take_census("play")
+        return result
+
+    def wait(self, *args, **kwargs):
+        result = super().wait(*args, **kwargs)
+        if self.census_mode:
+            self.take_census("wait")
+        return result
+
+    # -----------------------------
+    # Census
+    # -----------------------------
+    def invisible_mobjects(self):
+        """Top-level mobjects none of whose family members draw anything."""
+        frame = getattr(self.camera, "frame", None)
+        return [
+            mob for mob in self.mobjects
+            if mob is not frame and not any(map(is_visible, mob.get_family()))
+        ]
+
+    def take_census(self, kind):
+        family = self.get_mobject_family_members()
+        invisible = self.invisible_mobjects()
+
+        streaks = {id(mob): self._invisible_streaks.get(id(mob), 0) + 1 for mob in invisible}
+        self._invisible_streaks = streaks
+        leaked = [mob for mob in invisible if streaks[id(mob)] == self.census_grace]
+
+        index = len(self.census_history)
+        self.census_history.append({
+            "index": index,
+            "kind": kind,
+            "top_level": len(self.mobjects),
+            "family": len(family),
+            "invisible": len(invisible),
+            "types": dict(Counter(type(mob).__name__ for mob in family).most_common()),
+        })
+
+        if leaked and self.census_mode in ("warn", "prune"):
+            names = Counter(type(mob).__name__ for mob in leaked)
+            action = "pruning" if self.census_mode == "prune" else "still attached"
+            print(
+                f"census [{index}]: {len(leaked)} invisible mobjects {action}: "
+                + ", ".join(f"{n}x {name}" for name, n in names.most_common())
+            )
+        if self.census_mode == "prune":
+            stale = [mob for mob in invisible if streaks[id(mob)] >= self.census_grace]
+            if stale:
+                self.remove(*stale)
+                self.census_pruned += len(stale)
+                for mob in stale:
+                    del self._invisible_streaks[id(mob)]
+
+    def tear_down(self):
+        super().tear_down()
+        if not self.census_mode or not self.census_history:
+            return
+        history = self.census_history
+        peak = max(history, key=lambda entry: entry["family"])
+        print(
+            f"census: {len(history)} plays, family size {history[0]['family']} -> "
+            f"{history[-1]['family']} (peak {peak['family']} at [{peak['index']}]), "
+            f"{history[-1]['invisible']} invisible at the end, {self.census_pruned} pruned"
+        )
+        grown = Counter(history[-1]["types"])
+        grown.subtract(history[0]["types"])
+        growth = [(name, n) for name, n in grown.most_common(5) if n > 0]
+        if growth:
+            print("census growth: " + ", ".join(f"+{n} {name}" for name, n in growth))
+        if self.census_report:
+            with open(self.census_report, "w") as f:
+                json.dump(
+                    {"scene": type(self).__name__, "pruned": self.census_pruned, "history": history},
+                    f, indent=1,
+                )
@@ -0,0 +1,199 @@
+"""
+Opt-in render profiler for scenes.
+
+Set QUERA_PROFILE to an output directory and render as usual:
+
+    QUERA_PROFILE=profiles manimgl animation_v2.py QuantumCircuitScene -w
+
+Scenes that mix in ProfiledSceneMixin then time every play / wait call and
+every phase method listed in the scene's `profiled_methods` (construct by
+default; scenes add their phase and per-layer drivers, e.g. collapse_and_split
+or animate_circuit_layer). Only list coarse methods: each call becomes one
+event, so per-gate helpers would add overhead and noise. Each event records
+wall time, frames written and the time spent inside updaters, rasterization
+(camera capture) and encoding (writing frames to ffmpeg). play / wait events
+also record the live mobject count.
+
+At tear_down two files are written to the directory:
+- <Scene>_profile.json: per-phase totals plus every play / wait call
+- <Scene>_trace.json: Chrome trace events, viewable as a flame graph in
+  chrome://tracing, Perfetto or speedscope
+
+Without QUERA_PROFILE the mixin adds nothing but one attribute check per call.
+"""
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+BUCKETS = ("updaters", "raster", "encode")
+
+
+class RenderProfiler:
+    def __init__(self, scene_name):
+        self.scene_name = scene_name
+        self.start = time.perf_counter()
+        self.totals = dict.fromkeys(BUCKETS, 0.0)
+        self.frames = 0
+        self.events = []
+        self.phase_stack = []
+
+    # -----------------------------
+    # Hooks
+    # -----------------------------
+    def attach(self, scene, methods=("construct",)):
+        """Wraps the scene methods named in `methods` and its update / capture / encode calls."""
+        if hasattr(scene, "renderer"):  # manim CE
+            camera, writer = scene.renderer.camera, scene.renderer.file_writer
+            self._accumulate(camera, "capture_mobjects", "raster")
+        else:  # manimlib
+            camera, writer = scene.camera, scene.file_writer
+            self._accumulate(camera, "capture", "raster")
+        self._accumulate(scene, "update_mobjects", "updaters")
+        self._accumulate(writer, "write_frame", "encode", counts_frames=True)
+
+        for name in methods:
+            if name in ("play", "wait"):  # always recorded as calls by ProfiledSceneMixin
+                continue
+            if not callable(getattr(scene, name, None)):
+                raise AttributeError(f"{type(scene).__name__} has no method {name!r} to profile")
+            self._wrap_phase(scene, name)
+
+    def _accumulate(self, owner, name, bucket, counts_frames=False):
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.totals[bucket] += time.perf_counter() - start
+                if counts_frames:
+                    self.frames += 1
+
+        setattr(owner, name, timed)
+
+    def _wrap_phase(self, scene, name):
+        original = getattr(scene, name)
+
+        @functools.wraps(original)
+        def phase(*args, **kwargs):
+            with self.event("phase", name):
+                return original(*args, **kwargs)
+
+        setattr(scene, name, phase)
+
+    # -----------------------------
+    # Events
+    # -----------------------------
+    @contextmanager
+    def event(self, kind, name, **args):
+        """Times the enclosed block; yields the event dict so callers can add args."""
+        before = dict(self.totals, frames=self.frames)
+        record = {
+            "kind": kind,
+            "name": name,
+            "phase": self.phase_stack[-1] if self.phase_stack else None,
+            "start": time.perf_counter() - self.start,
+            **args,
+        }
+        if kind == "phase":
+            self.phase_stack.append(name)
+        try:
+            yield record
+        finally:
+            if kind == "phase":
+                self.phase_stack.pop()
+            record["wall"] = time.perf_counter() - self.start - record["start"]
+            record["frames"] = self.frames - before["frames"]
+            for bucket in BUCKETS:
+                record[bucket] = self.totals[bucket] - before[bucket]
+            self.events.append(record)
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+    def summary(self):
+        phases = {}
+        for event in self.events:
+            if event["kind"] != "phase":
+                continue
+            totals = phases.setdefault(
+                event["name"], {"calls": 0, "wall": 0.0, "frames": 0, **dict.fromkeys(BUCKETS, 0.0)}
+            )
+            totals["calls"] += 1
+            for key in ("wall", "frames", *BUCKETS):
+                totals[key] += event[key]
+        calls = [e for e in self.events if e["kind"] != "phase"]
+        return {
+            "scene": self.scene_name,
+            "wall": time.perf_counter() - self.start,
+            "frames": self.frames,
+            **self.totals,
+            "phases": dict(sorted(phases.items(), key=lambda item: -item[1]["wall"])),
+            "calls": sorted(calls, key=lambda e: e["start"]),
+        }
+
+    def chrome_trace(self):
+        events = []
+        for event in self.events:
+            args = {k: v for k, v in event.items() if k not in ("kind", "name", "start", "wall")}
+            events.append({
+                "name": event["name"],
+                "cat": event["kind"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["wall"] * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for suffix, data in (("profile", self.summary()), ("trace", self.chrome_trace())):
+            path = os.path.join(directory, f"{self.scene_name}_{suffix}.json")
+            with open(path, "w") as f:
+                json.dump(data, f, indent=1)
+            paths.append(path)
+        return paths
+
+
+class ProfiledSceneMixin:
+    profile_dir = os.environ.get("QUERA_PROFILE")
+    # Scene methods timed as phases; play and wait are always recorded
+    profiled_methods = ("construct",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = None
+        if self.profile_dir:
+            self.profiler = RenderProfiler(type(self).__name__)
+            self.profiler.attach(self, self.profiled_methods)
+
+    def play(self, *animations, **kwargs):
+        if self.profiler is None:
+            return super().play(*animations, **kwargs)
+        label = ", ".join(type(anim).__name__ for anim in animations[:3])
+        with self.profiler.event("play", label) as record:
+            result = super().play(*animations, **kwargs)
+            record["mobjects"] = len(self.get_mobject_family_members())
+        return result
+
+    def wait(self, *args, **kwargs):
+        if self.profiler is None:
+            return super().wait(*args, **kwargs)
+        with self.profiler.event("wait", "wait") as record:
+            result = super().wait(*args, **kwargs)
+            record["mobjects"] = len(self.get_mobject_family_members())
+        return result
+
+    def tear_down(self):
+        super().tear_down()
+        if self.profiler is not None:
+            for path in self.profiler.write(self.profile_dir):
+                print(f"Profile written to {path}")
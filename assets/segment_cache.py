@@ -0,0 +1,310 @@
+"""
+Content-hashed cache of rendered play / wait segments for manimlib scenes.
+
+Mix SegmentCacheMixin in before Scene. When the scene writes a movie, every
+play / wait call is rendered to its own partial movie (manimlib's subdivide
+mode) and stored in .segment_cache/<key>.mp4, where the key hashes
+
+- the animations (class, timing, rate function and the mobjects they carry,
+  including the code, defaults and closure values of any function they call),
+- every mobject in the scene going in (point data, uniforms, textures),
+  which includes the camera frame,
+- the render config (resolution, fps, background, codec).
+
+On a later run a call whose key is already cached is fast-forwarded like a
+skipped animation (final state only, nothing rasterized) and its cached clip
+is reused. A call whose inputs include a function that can't be hashed that
+way (a builtin bound to some object, or one nested too deep) is always
+rendered and never cached. At tear_down the partial movies are joined
+losslessly into the scene's movie file, so only the calls whose inputs
+changed get re-rendered.
+
+Each clip's mtime is its last use. After every render the least recently
+used clips are deleted until the cache fits in `segment_cache_max_mb`
+(QUERA_SEGMENT_CACHE_MB, default 2048); clips the render used are kept.
+Trim or empty the cache by hand with:
+
+    python segment_cache.py         # delete every cached clip
+    python segment_cache.py 500     # keep the most recent 500 MB
+"""
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import types
+
+import numpy as np
+from manimlib.animation.animation import prepare_animation
+from manimlib.mobject.mobject import Mobject
+
+SEGMENT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".segment_cache")
+
+
+def prune_segment_cache(directory=SEGMENT_CACHE_DIR, max_bytes=0, keep=()):
+    """
+    Deletes the least recently used clips in `directory` until the rest take
+    at most `max_bytes`, never touching paths in `keep`. Returns the number
+    of bytes freed.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    keep = {os.path.abspath(path) for path in keep}
+    entries = []
+    for entry in os.scandir(directory):
+        # .tmp files are clips another render is still writing
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, os.path.abspath(entry.path)))
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        if path not in keep:
+            os.remove(path)
+            freed += size
+    return freed
+
+
+def _copy_atomic(src, dst):
+    """
+    Copies through a temporary file next to `dst`, so other renders never see
+    a partly written clip, even if this one dies mid-copy.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(dst))
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class _OpaqueInput(Exception):
+    """Raised for an input whose effect on the render can't be hashed."""
+
+
+def _update_code(digest, code):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, type(code)):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _update_digest(digest, value, depth=0):
+    """
+    Feeds a (possibly nested) animation attribute into `digest`. Raises
+    _OpaqueInput for a callable it can't see into.
+    """
+    if isinstance(value, Mobject):
+        for mob in value.get_family():
+            digest.update(type(mob).__name__.encode())
+            digest.update(mob.data.tobytes())
+            for name, uniform in sorted(mob.uniforms.items()):
+                digest.update(name.encode())
+                digest.update(np.asarray(uniform).tobytes())
+            digest.update(repr(mob.texture_paths).encode())
+            digest.update(str(len(mob.get_updaters())).encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(value.tobytes())
+    elif isinstance(value, (str, int, float, bool, type(None))):
+        digest.update(repr(value).encode())
+    elif isinstance(value, (list, tuple)) and depth < 4:
+        for item in value:
+            _update_digest(digest, item, depth + 1)
+    elif isinstance(value, dict) and depth < 4:
+        for name, item in sorted(value.items(), key=lambda kv: repr(kv[0])):
+            digest.update(repr(name).encode())
+            _update_digest(digest, item, depth + 1)
+    elif callable(value):
+        _update_callable(digest, value, depth)
+    elif hasattr(value, "__dict__") and depth < 4:
+        digest.update(type(value).__name__.encode())
+        for name, item in sorted(vars(value).items()):
+            digest.update(name.encode())
+            _update_digest(digest, item, depth + 1)
+
+
+def _update_callable(digest, func, depth):
+    """
+    Hashes what a callable does, not just its name: two closures from the same
+    lambda differ by their cell contents (which qubits move, by how much).
+    """
+    digest.update(repr((
+        getattr(func, "__module__", None), getattr(func, "__qualname__", type(func).__name__)
+    )).encode())
+    if isinstance(func, type):
+        return
+    if depth >= 4:
+        raise _OpaqueInput(func)
+    if isinstance(func, functools.partial):
+        _update_digest(digest, func.func, depth + 1)
+        _update_digest(digest, (func.args, func.keywords), depth + 1)
+    elif isinstance(func, types.MethodType):
+        _update_digest(digest, func.__func__, depth + 1)
+        _update_digest(digest, func.__self__, depth + 1)
+    elif isinstance(func, types.FunctionType):
+        _update_code(digest, func.__code__)
+        _update_digest(digest, func.__defaults__, depth + 1)
+        _update_digest(digest, func.__kwdefaults__, depth + 1)
+        for cell in func.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:  # not yet assigned
+                continue
+            _update_digest(digest, contents, depth + 1)
+    elif isinstance(func, types.BuiltinFunctionType):
+        # Module-level builtins (math.sin) are pure; bound ones depend on their object
+        if not isinstance(func.__self__, (types.ModuleType, type(None))):
+            raise _OpaqueInput(func)
+    elif isinstance(func, np.ufunc):
+        pass
+    elif hasattr(func, "__dict__"):
+        # Callable instance: its state plus its class's __call__
+        _update_digest(digest, type(func).__call__, depth + 1)
+        for name, item in sorted(vars(func).items()):
+            digest.update(name.encode())
+            _update_digest(digest, item, depth + 1)
+    else:
+        raise _OpaqueInput(func)
+
+
+class SegmentCacheMixin:
+    segment_cache_dir = SEGMENT_CACHE_DIR
+    # Least recently used clips beyond this are deleted after each render
+    segment_cache_max_mb = float(os.environ.get("QUERA_SEGMENT_CACHE_MB", 2048))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        writer = self.file_writer
+        self.segment_cache_enabled = writer.write_to_movie and not writer.subdivide_output
+        self.segment_files = []
+        self.segment_hits = 0
+        self._segment_key = None
+        self._segment_hit = None
+        self._segment_used = set()
+        # The user's own skip setting, before -n forces skipping up to its start;
+        # a fast-forwarded hit restores this, not whatever it was mid-render
+        self._user_skip_animations = self.original_skipping_status
+        if self.segment_cache_enabled:
+            # One partial movie per play / wait, joined again in tear_down
+            writer.subdivide_output = True
+            writer.partial_movie_directory = writer.init_partial_movie_directory()
+            os.makedirs(self.segment_cache_dir, exist_ok=True)
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    def segment_key(self, kind, *inputs):
+        """Hex digest of the call, or None when some input can't be hashed."""
+        digest = hashlib.sha1(kind.encode())
+        camera, writer = self.camera, self.file_writer
+        digest.update(repr((
+            camera.get_pixel_shape(), camera.fps, tuple(camera.background_rgba),
+            writer.video_codec, writer.pixel_format, writer.saturation, writer.gamma,
+        )).encode())
+        for mob in self.mobjects:
+            _update_digest(digest, mob)
+        try:
+            for value in inputs:
+                _update_digest(digest, value)
+        except _OpaqueInput:
+            return None
+        return digest.hexdigest()
+
+    def play(self, *proto_animations, **kwargs):
+        animations = list(map(prepare_animation, proto_animations))
+        if self.segment_cache_enabled and animations:
+            for anim in animations:
+                anim.update_rate_info(
+                    kwargs.get("run_time"), kwargs.get("rate_func"), kwargs.get("lag_ratio")
+                )
+            self._segment_key = self.segment_key("play", animations)
+        super().play(*animations, **kwargs)
+
+    def wait(self, duration=None, stop_condition=None, *args, **kwargs):
+        if self.segment_cache_enabled and stop_condition is None:
+            self._segment_key = self.segment_key(
+                "wait", duration if duration is not None else self.default_wait_time
+            )
+        super().wait(duration, stop_condition, *args, **kwargs)
+
+    # -----------------------------
+    # Serving segments
+    # -----------------------------
+    def cached_segment_path(self, key):
+        return os.path.join(self.segment_cache_dir, key + self.file_writer.movie_file_extension)
+
+    def pre_play(self):
+        key, self._segment_hit = self._segment_key, None
+        if key and not self.skip_animations:
+            hit = self.cached_segment_path(key)
+            try:
+                # Copied before committing to the fast-forward: a clip pruned
+                # by another render since the key was made is just a miss
+                shutil.copyfile(hit, str(self.file_writer.get_next_partial_movie_path()))
+                os.utime(hit)  # mark as recently used
+            except FileNotFoundError:
+                pass
+            else:
+                # Fast-forward: final state only, no frames written
+                self._segment_hit = hit
+                self.skip_animations = True
+        super().pre_play()
+
+    def post_play(self):
+        key, hit = self._segment_key, self._segment_hit
+        rendered = self.segment_cache_enabled and not self.skip_animations
+        partial_path = str(self.file_writer.get_next_partial_movie_path()) if (
+            self.segment_cache_enabled
+        ) else None
+        super().post_play()
+        self._segment_key = self._segment_hit = None
+
+        if hit:
+            self._segment_used.add(hit)
+            self.skip_animations = self._user_skip_animations
+            self.segment_hits += 1
+            self.segment_files.append(partial_path)
+        elif rendered:
+            if key:
+                _copy_atomic(partial_path, self.cached_segment_path(key))
+                self._segment_used.add(self.cached_segment_path(key))
+            self.segment_files.append(partial_path)
+
+    def tear_down(self):
+        super().tear_down()
+        if not self.segment_cache_enabled or not self.segment_files:
+            return
+        movie_path = str(self.file_writer.get_movie_file_path())
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+            for path in self.segment_files:
+                listing.write(f"file '{os.path.abspath(path)}'\n")
+        try:
+            subprocess.run(
+                [self.file_writer.ffmpeg_bin, "-y", "-loglevel", "error", "-f", "concat",
+                 "-safe", "0", "-i", listing.name, "-c", "copy", movie_path],
+                check=True,
+            )
+        finally:
+            os.remove(listing.name)
+        print(
+            f"{len(self.segment_files)} segments ({self.segment_hits} from cache) -> {movie_path}"
+        )
+        prune_segment_cache(
+            self.segment_cache_dir, self.segment_cache_max_mb * 2 ** 20, self._segment_used
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    max_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+    freed = prune_segment_cache(max_bytes=max_mb * 2 ** 20)
+    print(f"Freed {freed / 2 ** 20:.1f} MB from {SEGMENT_CACHE_DIR}")
@@ -0,0 +1,202 @@
+"""
+Aaronson-Gottesman stabilizer tableau for the Clifford gates the scenes use
+(SY, -SY, H, X, CZ, CNOT, M), sized for thousands of qubits.
+
+The tableau holds 2n + 1 rows (n destabilizers, n stabilizers and one scratch
+row) of Pauli X / Z bits packed 64 qubits to a uint64 word, plus a sign bit per
+row. A gate on qubit a touches one bit column of every row at once, so a gate
+costs O(n) word operations and a row product O(n / 64); measurement is
+O(n^2 / 64).
+
+Exposes the same apply_gate / probabilities / measure interface as
+statevector.StateVector, plus qubit_states() for per-qubit shading.
+"""
+import numpy as np
+
+# qubit_states() codes
+STATE_ZERO, STATE_ONE, STATE_PLUS, STATE_MINUS, STATE_ENTANGLED = range(5)
+STATE_NAMES = ("|0>", "|1>", "|+>", "|->", "entangled")
+
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """Number of set bits in each row of a uint64 array (summed over the last axis)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(*words.shape[:-1], -1)
+    return _POPCOUNT_8[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+class StabilizerTableau:
+    def __init__(self, n_qubits):
+        self.n_qubits = n_qubits
+        n_words = (n_qubits + 63) // 64
+        self.x = np.zeros((2 * n_qubits + 1, n_words), dtype=np.uint64)
+        self.z = np.zeros((2 * n_qubits + 1, n_words), dtype=np.uint64)
+        self.r = np.zeros(2 * n_qubits + 1, dtype=np.uint8)
+        # |0...0>: destabilizer i = X_i, stabilizer i = Z_i
+        qubits = np.arange(n_qubits)
+        self.x[qubits, qubits >> 6] = self._mask(qubits)
+        self.z[n_qubits + qubits, qubits >> 6] = self._mask(qubits)
+
+    def copy(self):
+        other = StabilizerTableau.__new__(StabilizerTableau)
+        other.n_qubits = self.n_qubits
+        other.x, other.z, other.r = self.x.copy(), self.z.copy(), self.r.copy()
+        return other
+
+    def state_arrays(self):
+        return {"x": self.x, "z": self.z, "r": self.r}
+
+    def load_state_arrays(self, arrays):
+        self.x[:], self.z[:], self.r[:] = arrays["x"], arrays["z"], arrays["r"]
+
+    @staticmethod
+    def _mask(q):
+        return np.left_shift(np.uint64(1), np.asarray(q, dtype=np.uint64) & np.uint64(63))
+
+    def _column(self, bits, q, rows=slice(None)):
+        """Bit q of every row in `rows`, as a uint8 array."""
+        word = bits[rows, q >> 6] >> np.uint64(q & 63)
+        return (word & np.uint64(1)).astype(np.uint8)
+
+    def _set_column(self, bits, q, values):
+        mask = self._mask(q)
+        column = bits[:, q >> 6]
+        column &= ~mask
+        column |= values.astype(np.uint64) << np.uint64(q & 63)
+
+    # -----------------------------
+    # Gates
+    # -----------------------------
+    def h(self, a):
+        xa, za = self._column(self.x, a), self._column(self.z, a)
+        self.r ^= xa & za
+        self._set_column(self.x, a, za)
+        self._set_column(self.z, a, xa)
+
+    def s(self, a):
+        xa, za = self._column(self.x, a), self._column(self.z, a)
+        self.r ^= xa & za
+        self._set_column(self.z, a, za ^ xa)
+
+    def pauli_x(self, a):
+        self.r ^= self._column(self.z, a)
+
+    def pauli_z(self, a):
+        self.r ^= self._column(self.x, a)
+
+    def sy(self, a):
+        # RY(pi/2) = H Z: Z -> X, X -> -Z
+        self.pauli_z(a)
+        self.h(a)
+
+    def minus_sy(self, a):
+        # RY(-pi/2) = Z H: Z -> -X, X -> Z
+        self.h(a)
+        self.pauli_z(a)
+
+    def cnot(self, control, target):
+        xa, za = self._column(self.x, control), self._column(self.z, control)
+        xb, zb = self._column(self.x, target), self._column(self.z, target)
+        self.r ^= xa & zb & (xb ^ za ^ 1)
+        self._set_column(self.x, target, xb ^ xa)
+        self._set_column(self.z, control, za ^ zb)
+
+    def cz(self, a, b):
+        self.h(b)
+        self.cnot(a, b)
+        self.h(b)
+
+    def apply_gate(self, gtype, qubits, rng=None):
+        """Applies one gate by scene name ("SY", "-SY", "H", "X", "CZ", "CNOT", "M")."""
+        single = {"SY": self.sy, "-SY": self.minus_sy, "H": self.h, "X": self.pauli_x}
+        if gtype in single:
+            for q in qubits:
+                single[gtype](q)
+        elif gtype == "CZ":
+            self.cz(*qubits)
+        elif gtype == "CNOT":
+            self.cnot(*qubits)
+        elif gtype == "M":
+            return [self.measure(q, rng) for q in qubits]
+
+    # -----------------------------
+    # Row products
+    # -----------------------------
+    def rowsum(self, h, i):
+        """Rows h <- row i * rows h, with the phase tracked mod 4. `h` may be an array."""
+        x1, z1 = self.x[i], self.z[i]
+        x2, z2 = self.x[h], self.z[h]
+        # g(...) is +1 for X*Y, Y*Z, Z*X and -1 for X*Z, Z*Y, Y*X
+        X1, Y1, Z1 = x1 & ~z1, x1 & z1, ~x1 & z1
+        X2, Y2, Z2 = x2 & ~z2, x2 & z2, ~x2 & z2
+        plus = (X1 & Y2) | (Y1 & Z2) | (Z1 & X2)
+        minus = (X1 & Z2) | (Y1 & X2) | (Z1 & Y2)
+        phase = 2 * self.r[h].astype(np.int64) + 2 * int(self.r[i])
+        phase += popcount(plus) - popcount(minus)
+        self.r[h] = (np.mod(phase, 4) == 2).astype(np.uint8)
+        self.x[h] = x2 ^ x1
+        self.z[h] = z2 ^ z1
+
+    def _product_sign(self, rows):
+        """Sign bit of the product of stabilizer `rows`, built in the scratch row."""
+        scratch = 2 * self.n_qubits
+        self.x[scratch] = 0
+        self.z[scratch] = 0
+        self.r[scratch] = 0
+        for row in rows:
+            self.rowsum(scratch, row)
+        return int(self.r[scratch])
+
+    # -----------------------------
+    # Measurement and readout
+    # -----------------------------
+    def measure(self, a, rng=None):
+        """Z measurement of qubit a; collapses the tableau and returns 0 or 1."""
+        n = self.n_qubits
+        x_col = self._column(self.x, a, slice(0, 2 * n))
+        anticommuting = np.flatnonzero(x_col[n:]) + n
+        if len(anticommuting) == 0:
+            return self._product_sign(np.flatnonzero(x_col[:n]) + n)
+
+        rng = rng or np.random.default_rng()
+        p = anticommuting[0]
+        others = np.flatnonzero(x_col)
+        others = others[others != p]
+        if len(others):
+            self.rowsum(others, p)
+        self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+        self.x[p] = 0
+        self.z[p] = 0
+        self.z[p, a >> 6] = self._mask(a)
+        self.r[p] = outcome = int(rng.random() < 0.5)
+        return outcome
+
+    def _deterministic(self, bits):
+        """Qubits whose Z (bits=x) or X (bits=z) value is fixed by the stabilizers."""
+        n = self.n_qubits
+        any_set = np.bitwise_or.reduce(bits[n:2 * n], axis=0)
+        qubits = np.arange(n)
+        return (any_set[qubits >> 6] >> (qubits & 63).astype(np.uint64)) & np.uint64(1) == 0
+
+    def qubit_states(self):
+        """Per-qubit STATE_* code: a Z or X eigenstate, or entangled / mixed."""
+        n = self.n_qubits
+        states = np.full(n, STATE_ENTANGLED, dtype=np.int8)
+        for q in np.flatnonzero(self._deterministic(self.x)):
+            rows = np.flatnonzero(self._column(self.x, q, slice(0, n))) + n
+            states[q] = STATE_ZERO + self._product_sign(rows)
+        for q in np.flatnonzero(self._deterministic(self.z)):
+            rows = np.flatnonzero(self._column(self.z, q, slice(0, n))) + n
+            states[q] = STATE_PLUS + self._product_sign(rows)
+        return states
+
+    def probabilities(self):
+        """P(qubit q = 1): 0 or 1 for Z eigenstates, 1/2 otherwise."""
+        p1 = np.full(self.n_qubits, 0.5)
+        for q in np.flatnonzero(self._deterministic(self.x)):
+            rows = np.flatnonzero(self._column(self.x, q, slice(0, self.n_qubits)))
+            p1[q] = self._product_sign(rows + self.n_qubits)
+        return p1
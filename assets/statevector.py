@@ -0,0 +1,117 @@
+"""
+Small NumPy statevector simulator for the gates QuantumCircuitScene draws.
+
+The state is one flat complex array viewed as a (2,) * n tensor, with qubit q
+on axis n - 1 - q (little-endian, so basis index bit q is qubit q). Every gate
+is applied in place through strided views of that tensor: a single-qubit gate
+touches the q=0 / q=1 halves, CZ flips the sign of the |11> quarter and CNOT
+swaps two quarters, so no 2**n x 2**n matrix is ever built.
+
+Around 24 qubits is the practical limit (2**24 complex128 amplitudes = 256 MB).
+"""
+import numpy as np
+
+MAX_STATEVECTOR_QUBITS = 24
+
+_S = 1 / np.sqrt(2)
+SINGLE_QUBIT_GATES = {
+    "SY": np.array([[_S, -_S], [_S, _S]]),  # sqrt(Y) up to global phase: RY(pi/2)
+    "-SY": np.array([[_S, _S], [-_S, _S]]),  # RY(-pi/2)
+    "H": np.array([[_S, _S], [_S, -_S]]),
+    "X": np.array([[0, 1], [1, 0]]),
+}
+
+
+class StateVector:
+    def __init__(self, n_qubits, dtype=np.complex128):
+        if n_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ValueError(
+                f"{n_qubits} qubits is too many for a statevector "
+                f"(max {MAX_STATEVECTOR_QUBITS})"
+            )
+        self.n_qubits = n_qubits
+        self.amplitudes = np.zeros(2 ** n_qubits, dtype=dtype)
+        self.amplitudes[0] = 1
+        self.tensor = self.amplitudes.reshape((2,) * n_qubits)
+
+    def copy(self):
+        other = StateVector(self.n_qubits, self.amplitudes.dtype)
+        other.amplitudes[:] = self.amplitudes
+        return other
+
+    def state_arrays(self):
+        return {"amplitudes": self.amplitudes}
+
+    def load_state_arrays(self, arrays):
+        self.amplitudes[:] = arrays["amplitudes"]
+
+    def _index(self, *fixed):
+        """
+        Tensor index fixing each (qubit, bit) pair in `fixed`; other axes stay
+        whole. Fixed axes keep length 1 so the result is always a view.
+        """
+        index = [slice(None)] * self.n_qubits
+        for q, bit in fixed:
+            index[self.n_qubits - 1 - q] = slice(bit, bit + 1)
+        return tuple(index)
+
+    # -----------------------------
+    # Gates
+    # -----------------------------
+    def apply_single(self, matrix, q):
+        a = self.tensor[self._index((q, 0))]
+        b = self.tensor[self._index((q, 1))]
+        a_old = a.copy()
+        a *= matrix[0, 0]
+        a += matrix[0, 1] * b
+        b *= matrix[1, 1]
+        b += matrix[1, 0] * a_old
+
+    def apply_cz(self, q1, q2):
+        self.tensor[self._index((q1, 1), (q2, 1))] *= -1
+
+    def apply_cnot(self, control, target):
+        c1_t0 = self._index((control, 1), (target, 0))
+        c1_t1 = self._index((control, 1), (target, 1))
+        swap = self.tensor[c1_t0].copy()
+        self.tensor[c1_t0] = self.tensor[c1_t1]
+        self.tensor[c1_t1] = swap
+
+    def apply_gate(self, gtype, qubits, rng=None):
+        """Applies one gate by scene name ("SY", "-SY", "H", "X", "CZ", "CNOT", "M")."""
+        if gtype in SINGLE_QUBIT_GATES:
+            for q in qubits:
+                self.apply_single(SINGLE_QUBIT_GATES[gtype], q)
+        elif gtype == "CZ":
+            self.apply_cz(*qubits)
+        elif gtype == "CNOT":
+            self.apply_cnot(*qubits)
+        elif gtype == "M":
+            return [self.measure(q, rng) for q in qubits]
+
+    # -----------------------------
+    # Readout
+    # -----------------------------
+    def probabilities(self):
+        """P(qubit q = 1) for every qubit, from one pass over |amplitude|**2."""
+        probs = np.abs(self.amplitudes) ** 2
+        return np.array([
+            probs.reshape(-1, 2, 2 ** q)[:, 1, :].sum() for q in range(self.n_qubits)
+        ])
+
+    def measure(self, q, rng=None):
+        """Projective Z measurement of qubit q; collapses the state."""
+        rng = rng or np.random.default_rng()
+        zero = self.tensor[self._index((q, 0))]
+        one = self.tensor[self._index((q, 1))]
+        p1 = float(np.sum(np.abs(one) ** 2))
+        outcome = int(rng.random() < p1)
+        kept, dropped = (one, zero) if outcome else (zero, one)
+        dropped[...] = 0
+        kept /= np.sqrt(p1 if outcome else 1 - p1)
+        return outcome
+
+
+def probability_to_level(p1):
+    """Maps P(1) to the nearest sprite level: 0, 25, 50, 75 or 100."""
+    return (np.rint(np.asarray(p1) * 4) * 25).astype(int)
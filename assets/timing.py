@@ -0,0 +1,98 @@
+"""
+Timing profiles shared by every scene.
+
+Pick one with the QUERA_TIMING environment variable (default "final"):
+
+    QUERA_TIMING=draft manim -pql catiecooks.py ZonedQubitArchitecture
+
+- draft:  everything 4x faster, plain waits dropped, 480p at 15 fps
+- review: everything 1.5x faster, 720p at 30 fps
+- final:  authored timing; resolution and fps come from the CLI flags
+
+Scenes opt in with TimedSceneMixin (listed before the Scene base). It
+multiplies every play run_time (the one passed to play, or else each
+animation's own) by the profile's scale and the scene's own `time_scale`
+class attribute, so timing is tuned in one place instead of through per-file
+RUN_TIME / SLOW constants. Wait durations follow the profile's scale only:
+like SLOW before it, `time_scale` paces animations and leaves explicit holds
+alone. Waits with a stop_condition are never dropped.
+
+Works with both manim CE and manimlib scenes, even in a file that imports
+both: the backend is taken from the scene's own base classes.
+"""
+import os
+from collections import namedtuple
+
+TimingProfile = namedtuple(
+    "TimingProfile", ["time_scale", "keep_waits", "resolution", "fps"]
+)
+
+PROFILES = {
+    "draft": TimingProfile(time_scale=0.25, keep_waits=False, resolution=(854, 480), fps=15),
+    "review": TimingProfile(time_scale=2 / 3, keep_waits=True, resolution=(1280, 720), fps=30),
+    "final": TimingProfile(time_scale=1.0, keep_waits=True, resolution=None, fps=None),
+}
+DEFAULT_WAIT_TIME = 1.0
+
+
+def active_profile():
+    name = os.environ.get("QUERA_TIMING", "final")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown timing profile {name!r}, expected one of {sorted(PROFILES)}")
+    return PROFILES[name]
+
+
+def scene_backend(scene_class):
+    """"manimlib" or "manim", from the module the scene's Scene base lives in."""
+    for base in scene_class.__mro__:
+        if base.__module__.startswith("manimlib."):
+            return "manimlib"
+    return "manim"
+
+
+class TimedSceneMixin:
+    # Per-scene slowdown (> 1) or speedup (< 1) of animations on top of the profile
+    time_scale = 1.0
+
+    def __init__(self, *args, **kwargs):
+        self.timing = active_profile()
+        if self.timing.resolution is not None:
+            if scene_backend(type(self)) == "manimlib":
+                kwargs["camera_config"] = {
+                    **kwargs.get("camera_config", {}),
+                    "resolution": self.timing.resolution,
+                    "fps": self.timing.fps,
+                }
+            else:
+                from manim import config
+
+                config.pixel_width, config.pixel_height = self.timing.resolution
+                config.frame_rate = self.timing.fps
+        super().__init__(*args, **kwargs)
+
+    @property
+    def run_time_scale(self):
+        return self.timing.time_scale * self.time_scale
+
+    def play(self, *animations, **kwargs):
+        scale = self.run_time_scale
+        if kwargs.get("run_time") is not None:
+            kwargs["run_time"] *= scale
+        elif scale != 1:
+            # Scale each animation's own run_time so shorter ones stay shorter
+            if scene_backend(type(self)) == "manimlib":
+                from manimlib.animation.animation import prepare_animation
+            else:
+                from manim.animation.animation import prepare_animation
+            animations = [prepare_animation(anim) for anim in animations]
+            for anim in animations:
+                anim.set_run_time(anim.get_run_time() * scale)
+        return super().play(*animations, **kwargs)
+
+    def wait(self, duration=None, *args, **kwargs):
+        stop_condition = kwargs.get("stop_condition", args[0] if args else None)
+        if not self.timing.keep_waits and stop_condition is None:
+            return  # decorative pause
+        if duration is None:
+            duration = DEFAULT_WAIT_TIME
+        return super().wait(duration * self.timing.time_scale, *args, **kwargs)
@@ -0,0 +1,194 @@
+"""
+Array-backed stand-in for quera_qubit_lib.QubitArray (manimlib).
+
+QubitArray makes one mobject per atom, so every move animates N separate
+mobjects. VectorQubitArray keeps every atom position in the points of one
+DotCloud and the loaded sites in one boolean grid; moves are masked array
+operations and a whole parallel move is one UpdateFromAlphaFunc.
+
+Every atom also keeps integer (row, col) lattice coordinates, with row -> atoms
+and col -> atoms indexes. A move that lands atoms on lattice sites updates
+only the moved atoms' entries, so selecting a column or row is a lookup over
+the atoms selected instead of a scan over the whole array. Atoms that land
+on a site are also snapped to its exact coordinates, so float error from
+chained relative moves never lets positions drift away from the index.
+
+It accepts the same constructor arguments and move_qubits(scene, moves, ...)
+call as QubitArray for the grid layout, so MSDScene can use either one.
+"""
+from collections import defaultdict
+
+import numpy as np
+from manimlib import BLUE, DotCloud, UpdateFromAlphaFunc, color_to_rgb
+
+
+class VectorQubitArray(DotCloud):
+    def __init__(
+        self,
+        layout="grid",
+        rows=5,
+        cols=17,
+        qubit_spacing=0.7,
+        use_vacancies=False,
+        fill_pattern="all",
+        radius=None,
+        color=BLUE,
+        **kwargs,
+    ):
+        if layout != "grid":
+            raise ValueError(f"VectorQubitArray only supports the grid layout, not {layout!r}")
+        self.rows, self.cols = rows, cols
+        self.qubit_spacing = qubit_spacing
+
+        # Loaded sites, row-major; fill_pattern may also be a (rows, cols) mask
+        if not use_vacancies or (isinstance(fill_pattern, str) and fill_pattern == "all"):
+            self.occupancy = np.ones((rows, cols), dtype=bool)
+        elif isinstance(fill_pattern, str):
+            raise ValueError(f"Unknown fill_pattern {fill_pattern!r}")
+        else:
+            self.occupancy = np.asarray(fill_pattern, dtype=bool).reshape(rows, cols)
+
+        r, c = np.nonzero(self.occupancy)
+        super().__init__(
+            self.site_positions(r, c),
+            color=color,
+            radius=0.2 * qubit_spacing if radius is None else radius,
+            **kwargs,
+        )
+        self.lattice = np.column_stack([r, c])
+        self.row_index = defaultdict(set)
+        self.col_index = defaultdict(set)
+        for idx, (row, col) in enumerate(self.lattice.tolist()):
+            self.row_index[row].add(idx)
+            self.col_index[col].add(idx)
+
+    # -----------------------------
+    # Geometry
+    # -----------------------------
+    def site_positions(self, rows, cols):
+        """Scene coordinates of lattice sites (row 0 on top, centered on the origin)."""
+        rows, cols = np.broadcast_arrays(rows, cols)
+        positions = np.zeros((rows.size, 3))
+        positions[:, 0] = (cols.ravel() - (self.cols - 1) / 2) * self.qubit_spacing
+        positions[:, 1] = ((self.rows - 1) / 2 - rows.ravel()) * self.qubit_spacing
+        return positions
+
+    def lattice_coordinates(self, positions):
+        """Fractional (row, col) of scene positions; whole numbers on a site."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        return np.column_stack([
+            (self.rows - 1) / 2 - positions[:, 1] / self.qubit_spacing,
+            positions[:, 0] / self.qubit_spacing + (self.cols - 1) / 2,
+        ])
+
+    @property
+    def positions(self):
+        return self.get_points()
+
+    @property
+    def qubits(self):
+        """(index, position) per atom, in the shape QubitArray.qubits iterates as."""
+        return list(zip(range(self.get_num_points()), self.positions))
+
+    def set_qubit_positions(self, indices, positions):
+        points = self.get_points().copy()
+        points[indices] = positions
+        self.set_points(points)
+        self.refresh_bounding_box()
+        return self
+
+    def set_qubit_colors(self, colors, indices=slice(None)):
+        """One color per selected atom; each distinct color is converted once."""
+        rgbs = {color: color_to_rgb(color) for color in set(colors)}
+        self.data["rgba"][indices, :3] = np.array([rgbs[color] for color in colors])
+        self.note_changed_data()
+        return self
+
+    # -----------------------------
+    # Lattice index
+    # -----------------------------
+    def _select(self, index, keys):
+        groups = [np.sort(np.fromiter(index.get(int(key), ()), dtype=int)) for key in keys]
+        if not groups:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        return np.concatenate(groups), np.repeat(keys, [len(g) for g in groups])
+
+    def atoms_in_columns(self, cols):
+        """(atom indices, the column each sits in) for every atom in `cols`."""
+        return self._select(self.col_index, cols)
+
+    def atoms_in_rows(self, rows):
+        """(atom indices, the row each sits in) for every atom in `rows`."""
+        return self._select(self.row_index, rows)
+
+    def relocate(self, indices, rows, cols):
+        """Records atoms as sitting on new lattice sites, touching only their entries."""
+        indices, rows, cols = np.asarray(indices), np.asarray(rows), np.asarray(cols)
+        old = self.lattice[indices]
+        for idx, (old_row, old_col), row, col in zip(
+            indices.tolist(), old.tolist(), rows.tolist(), cols.tolist()
+        ):
+            self.row_index[old_row].discard(idx)
+            self.col_index[old_col].discard(idx)
+            self.row_index[row].add(idx)
+            self.col_index[col].add(idx)
+        self.occupancy[old[:, 0], old[:, 1]] = False
+        self.occupancy[rows, cols] = True
+        self.lattice[indices] = np.column_stack([rows, cols])
+
+    def _snap_to_lattice(self, indices, positions):
+        """
+        Puts the moved atoms that now sit on a lattice site inside the grid
+        exactly on it, and relocates those whose site changed.
+        """
+        coords = self.lattice_coordinates(positions)
+        sites = np.rint(coords).astype(int)
+        on_site = (
+            (np.abs(coords - sites).max(axis=1) < 1e-3)
+            & (sites >= 0).all(axis=1)
+            & (sites < (self.rows, self.cols)).all(axis=1)
+        )
+        if not on_site.any():
+            return
+        indices, sites = indices[on_site], sites[on_site]
+        self.set_qubit_positions(indices, self.site_positions(sites[:, 0], sites[:, 1]))
+        moved = (sites != self.lattice[indices]).any(axis=1)
+        if moved.any():
+            self.relocate(indices[moved], sites[moved, 0], sites[moved, 1])
+
+    # -----------------------------
+    # Moves
+    # -----------------------------
+    def shift_qubits(self, scene, indices, delta, run_time=1.0, animate=True):
+        """
+        Moves the atoms at `indices` (or a boolean mask) by `delta`, one (3,)
+        vector or one row per atom, as a single animation. Atoms that end on
+        a lattice site are snapped onto it and re-indexed under it.
+        """
+        indices = np.arange(self.get_num_points())[indices]
+        start = self.positions[indices].astype(float)
+        end = start + np.asarray(delta, dtype=float)
+        if not animate:
+            self.set_qubit_positions(indices, end)
+        else:
+            scene.play(
+                UpdateFromAlphaFunc(
+                    self,
+                    lambda mob, alpha: mob.set_qubit_positions(indices, start + alpha * (end - start)),
+                ),
+                run_time=run_time,
+            )
+        self._snap_to_lattice(indices, end)
+
+    def move_to_sites(self, scene, indices, rows, cols, run_time=1.0, animate=True):
+        """Moves the atoms at `indices` onto lattice sites (rows[i], cols[i])."""
+        indices = np.arange(self.get_num_points())[indices]
+        delta = self.site_positions(rows, cols) - self.positions[indices]
+        self.shift_qubits(scene, indices, delta, run_time, animate)
+
+    def move_qubits(self, scene, moves, run_time=1.0, animate=True):
+        """QubitArray-style moves: (idx, dx, dy) per atom, as rows or tuples."""
+        moves = np.asarray(moves, dtype=float).reshape(-1, 3)
+        delta = np.zeros((len(moves), 3))
+        delta[:, :2] = moves[:, 1:]
+        self.shift_qubits(scene, moves[:, 0].astype(int), delta, run_time, animate)
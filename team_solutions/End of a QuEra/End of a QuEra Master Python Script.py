@@ -19,14 +19,24 @@ from manimlib import *   # Used by the quantum circuit scene
 import numpy as np
 from collections import defaultdict
 from pathlib import Path
+import sys
 import os
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared scene mixins and simulators live with the challenge assets
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets"))
+
+from atlas_mobject import AtlasImageMobject
+from text_cache import cached_text
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
+
 
 # ============================================================
 # SECTION 1 — INTRODUCTION: RUBIDIUM ATOM & LASER TRAP
 # ============================================================
 
-class RubidiumLaserTrap(Scene):
+class RubidiumLaserTrap(ProfiledSceneMixin, TimedSceneMixin, Scene):
     def construct(self):
 
         # -----------------------------
@@ -44,7 +54,7 @@ class RubidiumLaserTrap(Scene):
         electron = ImageMobject("handdrawn_assets/extras/idium_dad.png").scale(0.7)
         electron.move_to(electron_orbit.point_at_angle(0))
 
-        electron_label = Text("-", font_size=22, color=BLACK)
+        electron_label = cached_text("-", font_size=22, color=BLACK)
         electron_label.move_to(electron.get_center())
 
         atom = Group(electron_orbit, nucleus, electron, electron_label).move_to(ORIGIN)
@@ -119,14 +129,14 @@ class RubidiumLaserTrap(Scene):
         # -----------------------------
         level1 = Line(RIGHT * 2.2 + UP * 0.6, RIGHT * 4.2 + UP * 0.6, stroke_width=4)
         level2 = Line(RIGHT * 2.2 + DOWN * 0.6, RIGHT * 4.2 + DOWN * 0.6, stroke_width=4)
-        label1 = Text("E1", font_size=22).next_to(level1, LEFT)
-        label2 = Text("E2", font_size=22).next_to(level2, LEFT)
+        label1 = cached_text("E1", font_size=22).next_to(level1, LEFT)
+        label2 = cached_text("E2", font_size=22).next_to(level2, LEFT)
 
         self.play(Create(level1), Create(level2))
         self.play(FadeIn(label1), FadeIn(label2))
 
-        ket0 = Text("|0⟩", font_size=26).next_to(level1, RIGHT)
-        ket1 = Text("|1⟩", font_size=26).next_to(level2, RIGHT)
+        ket0 = cached_text("|0⟩", font_size=26).next_to(level1, RIGHT)
+        ket1 = cached_text("|1⟩", font_size=26).next_to(level2, RIGHT)
 
         self.play(FadeIn(ket0), FadeIn(ket1))
         self.wait(2)
@@ -139,9 +149,7 @@ class RubidiumLaserTrap(Scene):
 # Superposition, Entanglement, Magic State Distillation
 # ============================================================
 
-RUN_TIME = 0.8
-
-class QuantumCircuitScene(Scene):
+class QuantumCircuitScene(ProfiledSceneMixin, TimedSceneMixin, Scene):
     """
     Wizard-based quantum circuit visualization.
     Demonstrates:
@@ -201,14 +209,21 @@ class QuantumCircuitScene(Scene):
 
 ASSETS = Path("handdrawn_assets")
 WIZARD = ASSETS / "neutral_wizard_orange.png"
+WIZARD_SPRITE = "neutral_wizard_orange"  # WIZARD inside the shared sprite atlas
 
-class ZonedQubitArchitecture(MovingCameraScene):
+class ZonedQubitArchitecture(ProfiledSceneMixin, TimedSceneMixin, MovingCameraScene):
     """
     Visualizes atom shuttling in a neutral-atom architecture:
     - Storage zone
     - Entanglement zone
     - Readout zone
     """
+    # Phases the render profiler times (see render_profiler.py)
+    profiled_methods = (
+        "construct", "create_zones", "create_storage_qubits", "move_qubits_smoothly",
+        "zoom_into_entanglement", "show_entanglement_pairs", "zoom_back_out",
+        "zoom_into_readout",
+    )
 
     def construct(self):
         self.create_zones()
@@ -234,9 +249,9 @@ class ZonedQubitArchitecture(MovingCameraScene):
             Create(self.storage_box),
             Create(self.entangle_box),
             Create(self.readout_box),
-            FadeIn(Text("Storage").next_to(self.storage_box, UP)),
-            FadeIn(Text("Entanglement").next_to(self.entangle_box, UP)),
-            FadeIn(Text("Readout").next_to(self.readout_box, UP)),
+            FadeIn(cached_text("Storage").next_to(self.storage_box, UP)),
+            FadeIn(cached_text("Entanglement").next_to(self.entangle_box, UP)),
+            FadeIn(cached_text("Readout").next_to(self.readout_box, UP)),
         )
 
     # --------------------------------------------------
@@ -247,6 +262,10 @@ class ZonedQubitArchitecture(MovingCameraScene):
         rows, cols = 4, 6
         spacing = 0.65
         center = self.storage_box.get_center()
+        # Wizards are seen up close when the camera zooms into a zone box
+        zoomed_frame_height = (
+            self.camera.frame.height * self.entangle_box.width * 1.4 / self.camera.frame.width
+        )
 
         for i in range(n):
             r, c = divmod(i, cols)
@@ -255,7 +274,11 @@ class ZonedQubitArchitecture(MovingCameraScene):
                 (rows / 2 - r - 0.5) * spacing,
                 0
             ])
-            self.qubits.add(ImageMobject(WIZARD).scale(0.32).move_to(pos))
+            self.qubits.add(
+                AtlasImageMobject(
+                    WIZARD_SPRITE, scale=0.32, frame_height=zoomed_frame_height
+                ).move_to(pos)
+            )
 
         self.play(FadeIn(self.qubits))
 
@@ -1,110 +1,281 @@
 from manimlib import *
-from collections import defaultdict
+import sys
 import os
 
-RUN_TIME = 0.001
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared scene mixins and simulators live with the challenge assets
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets"))
+
+from sprite_cache import get_wizard_sprite
+from sprite_mipmaps import ASSET_DIR
+from qubit_state import QubitStateStore, parse_sprite_path
+from atlas_mobject import AtlasImageMobject
+from gate_glyphs import gate_glyph
+from wizard_effects import SparkBurst, SpellCurves, follow_paths
+from text_cache import cached_text
+from segment_cache import SegmentCacheMixin
+from mobject_census import MobjectCensusMixin
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
+from circuit_ir import (
+    CompactCircuit,
+    GATE_TYPES,
+    M,
+    TROLL,
+    TWO_QUBIT_OPS,
+    WIZARD_SINGLE_QUBIT_OPS,
+)
+from scheduler import schedule_circuit
+from circuit_loader import open_circuit, stream_layers
+from statevector import MAX_STATEVECTOR_QUBITS, StateVector, probability_to_level
+from stabilizer import StabilizerTableau
+from layer_snapshots import (
+    SNAPSHOT_DIR,
+    LayerSnapshots,
+    circuit_key,
+    rng_state_array,
+    set_rng_state,
+    source_key,
+)
+
+# Sprite every wizard shows after a troll flash
+TROLL_SPRITE = os.path.join(ASSET_DIR, "blue", "blue_50.png")
+# Both wizards of a two-qubit spell turn this color (keeping their level)
+SPELL_COLOR = "orange"
+SPELL_LEVEL = 50
+
+
+class QuantumCircuitScene(
+    ProfiledSceneMixin, MobjectCensusMixin, TimedSceneMixin, SegmentCacheMixin, Scene
+):
+    # Near-instant circuit diagram phases (scaled by the timing profile)
+    diagram_run_time = 0.001
+    # OpenQASM / JSON Lines file to stream instead of the built-in circuit
+    circuit_file = os.environ.get("QUERA_CIRCUIT_FILE")
+    # Seed for simulated measurement outcomes (None = different every render)
+    measurement_seed = 0
+    # Seed for gate spark scatter
+    spark_seed = 0
+    # Layer to start animating at; earlier layers come from saved snapshots
+    start_layer = int(os.environ.get("QUERA_START_LAYER", 0))
+    # Phases and per-layer drivers the render profiler times (see render_profiler.py)
+    profiled_methods = (
+        "construct", "construct_streamed", "restore_layer", "draw_qubits",
+        "draw_qubit_labels", "draw_and_animate_gates", "animate_qubit_states",
+        "collapse_and_split", "create_qubit_grid", "execute_circuit_wizard_style",
+        "animate_circuit_layer",
+    )
 
-
-class QuantumCircuitScene(Scene):
     def construct(self):
+        if self.circuit_file:
+            self.construct_streamed()
+            return
+
         # Parameters
         self.n_qubits = 7
-        self.circuit = [
-            {"type": "-SY", "qubits": [0], "x_shift": 2},
-            {"type": "-SY", "qubits": [1], "x_shift": 2},
-            {"type": "-SY", "qubits": [2], "x_shift": 2},
-            {"type": "-SY", "qubits": [3], "x_shift": 2},
-            {"type": "-SY", "qubits": [4], "x_shift": 2},
-            {"type": "-SY", "qubits": [5], "x_shift": 2},
-            {"type": "CZ", "qubits": [1, 2], "x_shift": 4},
-            {"type": "CZ", "qubits": [3, 4], "x_shift": 4},
-            {"type": "CZ", "qubits": [5, 6], "x_shift": 4},
-            {"type": "SY", "qubits": [6], "x_shift": 6},
-            {"type": "CZ", "qubits": [0, 3], "x_shift": 8},
-            {"type": "CZ", "qubits": [2, 5], "x_shift": 8},
-            {"type": "CZ", "qubits": [4, 6], "x_shift": 8},
-            {"type": "SY", "qubits": [2], "x_shift": 10},
-            {"type": "SY", "qubits": [3], "x_shift": 10},
-            {"type": "SY", "qubits": [4], "x_shift": 10},
-            {"type": "SY", "qubits": [5], "x_shift": 10},
-            {"type": "SY", "qubits": [6], "x_shift": 10},
-            {"type": "CZ", "qubits": [0, 1], "x_shift": 12},
-            {"type": "CZ", "qubits": [2, 3], "x_shift": 12},
-            {"type": "CZ", "qubits": [4, 5], "x_shift": 12},
-            {"type": "SY", "qubits": [1], "x_shift": 14},
-            {"type": "SY", "qubits": [2], "x_shift": 14},
-            {"type": "SY", "qubits": [4], "x_shift": 14},
-            {
-                "type": "M",
-                "qubits": [0, 1, 2, 3, 4, 5, 6],
-                "x_shift": 16,
-            },
-        ]
+        # Gates in program order; parallel layers (x_shift) come from the scheduler
+        self.schedule = "asap"  # or "alap"
+        self.max_two_qubit_gates = None  # CZ pairs the hardware drives per layer
+        self.circuit = CompactCircuit.from_dicts([
+            {"type": "-SY", "qubits": [0]},
+            {"type": "-SY", "qubits": [1]},
+            {"type": "-SY", "qubits": [2]},
+            {"type": "-SY", "qubits": [3]},
+            {"type": "-SY", "qubits": [4]},
+            {"type": "-SY", "qubits": [5]},
+            {"type": "CZ", "qubits": [1, 2]},
+            {"type": "CZ", "qubits": [3, 4]},
+            {"type": "CZ", "qubits": [5, 6]},
+            {"type": "SY", "qubits": [6]},
+            {"type": "CZ", "qubits": [0, 3]},
+            {"type": "CZ", "qubits": [2, 5]},
+            {"type": "CZ", "qubits": [4, 6]},
+            {"type": "SY", "qubits": [2]},
+            {"type": "SY", "qubits": [3]},
+            {"type": "SY", "qubits": [4]},
+            {"type": "SY", "qubits": [5]},
+            {"type": "SY", "qubits": [6]},
+            {"type": "CZ", "qubits": [0, 1]},
+            {"type": "CZ", "qubits": [2, 3]},
+            {"type": "CZ", "qubits": [4, 5]},
+            {"type": "SY", "qubits": [1]},
+            {"type": "SY", "qubits": [2]},
+            {"type": "SY", "qubits": [4]},
+            {"type": "M", "qubits": [0, 1, 2, 3, 4, 5, 6]},
+        ])
+        self.circuit = schedule_circuit(
+            self.circuit,
+            self.n_qubits,
+            mode=self.schedule,
+            max_two_qubit=self.max_two_qubit_gates,
+        )
 
-        self.qubit_asset_paths = [None] * self.n_qubits  # current file path per qubit
-        self.qubit_levels = [0] * self.n_qubits  # current state level per qubit
+        self.qubit_state = QubitStateStore(self.n_qubits)  # color / level / position per qubit
+        self.init_simulator()
+        self.init_snapshots()
 
         # Run phases
-        self.draw_qubits()
-        self.draw_qubit_labels()
-        self.draw_and_animate_gates()
-        self.animate_qubit_states()
+        if self.start_layer:
+            # Jump straight to the grid as it was before start_layer
+            self.restore_layer(self.start_layer - 1)
+        else:
+            self.draw_qubits()
+            self.draw_qubit_labels()
+            self.draw_and_animate_gates()
+            self.animate_qubit_states()
+            self.collapse_and_split()
+            self.create_qubit_grid()
+        self.execute_circuit_wizard_style()
+
+    def construct_streamed(self):
+        """
+        Animates a circuit file layer by layer as gates are read, without ever
+        materializing the whole circuit (so the static diagram is skipped).
+        """
+        n_qubits, gates = open_circuit(self.circuit_file)
+        if n_qubits is None:
+            raise ValueError(f"{self.circuit_file} needs an n_qubits header line")
+        self.n_qubits = n_qubits
+        self.qubit_state = QubitStateStore(self.n_qubits)
+        self.init_simulator()
+
         self.collapse_and_split()
         self.create_qubit_grid()
-        self.execute_circuit_wizard_style()
+        for layer in stream_layers(gates):
+            self.animate_circuit_layer(layer, np.arange(len(layer)))
+            self.wait(0.3)
+
+    def init_simulator(self):
+        """
+        Simulates the circuit alongside the animation so wizard levels and
+        smiles show real probabilities. Every scene gate is Clifford, so
+        circuits too wide for a statevector use a stabilizer tableau.
+        """
+        if self.n_qubits <= MAX_STATEVECTOR_QUBITS:
+            self.simulator = StateVector(self.n_qubits)
+        else:
+            self.simulator = StabilizerTableau(self.n_qubits)
+        self.measurement_rng = np.random.default_rng(self.measurement_seed)
+        self.spark_rng = np.random.default_rng(self.spark_seed)
+        self.qubit_smiles = None
+
+    def simulate_layer(self, circuit, gates):
+        """Applies `gates` to the simulator; returns P(1) per qubit."""
+        for g in gates:
+            self.simulator.apply_gate(
+                circuit.gate_type(g), circuit.gate_qubits(g), self.measurement_rng
+            )
+        return self.simulator.probabilities()
+
+    def simulate_layer_levels(self, circuit, gates):
+        """
+        Simulates one layer and returns (qubits, opcodes, levels, p1) for the
+        wizards it redraws: single-qubit gates plus measurements, with levels
+        following the simulated P(1).
+        """
+        p1 = self.simulate_layer(circuit, gates)
+        qubits, ops = circuit.expand(
+            circuit.select(gates, np.append(WIZARD_SINGLE_QUBIT_OPS, M))
+        )
+        return qubits, ops, probability_to_level(p1[qubits]), p1
+
+    def init_snapshots(self, keyframe_every=16):
+        self.snapshot_path = os.path.join(
+            SNAPSHOT_DIR,
+            circuit_key(
+                self.circuit, self.n_qubits, self.measurement_seed,
+                type(self.simulator).__name__,
+                # Snapshots recorded by older scene / simulator code are discarded
+                source_key(type(self), QubitStateStore, type(self.simulator), LayerSnapshots),
+            ) + ".npz",
+        )
+        if os.path.exists(self.snapshot_path):
+            self.snapshots = LayerSnapshots.load(self.snapshot_path)
+        else:
+            self.snapshots = LayerSnapshots(keyframe_every)
+
+    def capture_layer_state(self):
+        arrays = {"rng": rng_state_array(self.measurement_rng)}
+        for prefix, source in (("sim", self.simulator), ("qubits", self.qubit_state)):
+            for name, array in source.state_arrays().items():
+                arrays[f"{prefix}.{name}"] = array
+        return arrays
+
+    def restore_layer(self, layer, image_scale=0.5):
+        """
+        Puts the simulator, qubit state and grid where they were after `layer`
+        without animating anything. Layers missing from the snapshots are
+        replayed (simulation only) and recorded on the way.
+        """
+        self.camera.frame.scale(0.2)  # the zoom collapse_and_split leaves behind
+        positions, scale_factor = self.qubit_grid_layout(image_scale)
+        self.camera.frame.scale(scale_factor).move_to(ORIGIN)
+
+        if len(self.snapshots) > layer:
+            self.restore_layer_arrays(layer)
+        else:
+            # Replay from the start so measurement draws match a full render
+            self.snapshots.truncate(0)
+            self.qubit_state.set_positions(range(self.n_qubits), positions)
+            self.qubit_state.set_sprites(range(self.n_qubits), "blue", 0)  # create_qubit_grid
+            for index, (x_shift, gates) in enumerate(self.circuit.layers()):
+                if index > layer:
+                    break
+                self.replay_layer_state(self.circuit, gates)
+                self.snapshots.record(self.capture_layer_state())
+
+        frame_height = self.camera.frame.get_height()
+        self.qubit_images = Group(*[
+            get_wizard_sprite(
+                *self.qubit_state.color_and_level(i), image_scale, frame_height
+            ).move_to(self.qubit_state.position[i])
+            for i in range(self.n_qubits)
+        ])
+        self.add(self.qubit_images)
+        self.update_smiles(self.simulator.probabilities())
+
+    def replay_layer_state(self, circuit, gates):
+        """
+        Makes the simulator and qubit state updates animate_circuit_layer makes
+        for one layer, in the same order, without animating anything.
+        """
+        state = self.qubit_state
+        if np.any(circuit.opcode[gates] == TROLL):
+            state.set_sprites(range(self.n_qubits), *parse_sprite_path(TROLL_SPRITE))
+
+        # Single-qubit gates: new levels, wizards keep their color
+        qubits, _, levels, _ = self.simulate_layer_levels(circuit, gates)
+        colors = [state.color_name(i) or "blue" for i in qubits]
+        levels = state.set_levels(qubits, levels)
+        state.set_sprites(qubits, colors, levels)
+
+        # Two-qubit spells recolor both wizards of every pair
+        for i in circuit.expand(circuit.select(gates, TWO_QUBIT_OPS))[0].tolist():
+            _, level = state.color_and_level(i)
+            state.set_sprites([i], SPELL_COLOR, SPELL_LEVEL if level is None else level)
+
+    def restore_layer_arrays(self, layer):
+        arrays = self.snapshots.restore(layer)
+        set_rng_state(self.measurement_rng, arrays["rng"])
+        self.simulator.load_state_arrays(
+            {k[4:]: v for k, v in arrays.items() if k.startswith("sim.")}
+        )
+        self.qubit_state.load_state_arrays(
+            {k[7:]: v for k, v in arrays.items() if k.startswith("qubits.")}
+        )
 
     def execute_circuit_wizard_style(self):
-        # Group gates by x_shift so we animate parallel gates together
-        gates_by_x = defaultdict(list)
-        for gate_info in self.circuit:
-            gates_by_x[gate_info["x_shift"]].append(gate_info)
-
-        for x_shift, gates in sorted(gates_by_x.items()):
-            single_qubits = []
-            single_ops = []
-            two_qubit_pairs = []
-
-            # 1️⃣ Sort gates into single- or two-qubit
-            for gate_info in gates:
-                gtype = gate_info["type"]
-                qubits = gate_info["qubits"]
-
-                if gtype in [
-                    "SY",
-                    "-SY",
-                    "H",
-                ]:
-                    single_qubits.extend(qubits)
-                    single_ops.extend([gtype] * len(qubits))
-                elif gtype == "CZ" or gtype == "CNOT":
-                    two_qubit_pairs.append(qubits)
-                elif gtype == "TROLL":  # optional: special broadcast event
-                    self.troll_flash_and_replace_qubits()
-                    continue
-
-            # 2️⃣ Apply single-qubit wizard animations
-            if single_qubits:
-                self.apply_single_qubit_wizard_operations(
-                    qubit_indices=single_qubits,
-                    operations=single_ops,
-                    state_levels=[
-                        50 if single_ops[i] == "SY" else -50
-                        for i in range(len(single_ops))
-                    ],
-                    color_names=["blue"] * len(single_qubits),
-                    image_scale=0.5,
-                )
-
-            # 3️⃣ Apply two-qubit wizard spells
-            control, target = [], []
-            for pair in two_qubit_pairs:
-                control.append(pair[0])
-                target.append(pair[1])
-            if control and target:
-                self.wizard_spell_between_lists(control, target)
+        # Gates sharing an x_shift are animated together, one layer at a time
+        self.snapshots.truncate(self.start_layer)
+        for layer, (x_shift, gates) in enumerate(self.circuit.layers()):
+            if layer < self.start_layer:
+                continue
+            self.animate_circuit_layer(self.circuit, gates)
+            self.snapshots.record(self.capture_layer_state())
 
             # 4️⃣ Optional small wait between x_shifts
             self.wait(0.3)
+        self.snapshots.save(self.snapshot_path)
 
         # self.troll_flash_and_replace_qubits()
         # list1 = [2]  # first set of qubits
@@ -123,12 +294,39 @@ class QuantumCircuitScene(Scene):
         # list2 = [1, 6, 11]
         # self.wizard_spell_between_lists(list1, list2)
 
+    def animate_circuit_layer(self, circuit, gates):
+        """Plays one parallel layer (`gates` are indices into `circuit`)."""
+        # 1️⃣ Sort gates into single- or two-qubit
+        for _ in range(np.count_nonzero(circuit.opcode[gates] == TROLL)):
+            self.troll_flash_and_replace_qubits()  # optional: special broadcast event
+        two_qubit_pairs = circuit.expand(circuit.select(gates, TWO_QUBIT_OPS))[0]
+        two_qubit_pairs = two_qubit_pairs.reshape(-1, 2)
+
+        # 2️⃣ Apply single-qubit wizard animations
+        single_qubits, single_ops, state_levels, p1 = self.simulate_layer_levels(
+            circuit, gates
+        )
+        if len(single_qubits):
+            self.apply_single_qubit_wizard_operations(
+                qubit_indices=single_qubits.tolist(),
+                operations=[GATE_TYPES[op] for op in single_ops],
+                state_levels=state_levels.tolist(),
+                color_names=["blue"] * len(single_qubits),
+                image_scale=0.5,
+                absolute_levels=True,
+            )
+
+        # 3️⃣ Apply two-qubit wizard spells
+        if len(two_qubit_pairs):
+            self.wizard_spell_between_lists(
+                two_qubit_pairs[:, 0].tolist(), two_qubit_pairs[:, 1].tolist()
+            )
+
+        # 4️⃣ Smiles track the amplitudes
+        self.update_smiles(p1)
+
     def draw_qubits(self):
-        last_gate_x = [0] * self.n_qubits
-        for gate in self.circuit:
-            for q in gate["qubits"]:
-                last_gate_x[q] = max(last_gate_x[q], gate["x_shift"])
-        last_gate_x = [x + 1 for x in last_gate_x]  # padding
+        last_gate_x = (self.circuit.last_gate_x(self.n_qubits) + 1).tolist()  # padding
 
         # 1️⃣ Determine total horizontal width and vertical spacing
         total_width = max(last_gate_x) + 1
@@ -156,23 +354,22 @@ class QuantumCircuitScene(Scene):
         self.camera.frame.scale(1 / scale_factor)
         self.camera.frame.move_to(ORIGIN)  # center the frame
 
-        self.play(*[ShowCreation(q) for q in self.qubits], run_time=RUN_TIME)
+        self.play(*[ShowCreation(q) for q in self.qubits], run_time=self.diagram_run_time)
 
     def draw_qubit_labels(self):
         self.labels = VGroup(
             *[
-                Text(f"q{i}", font_size=24).next_to(self.qubits[i], LEFT)
+                cached_text(f"q{i}", font_size=24).next_to(self.qubits[i], LEFT)
                 for i in range(self.n_qubits)
             ]
         )
-        self.play(*[Write(label) for label in self.labels], run_time=RUN_TIME)
+        self.play(*[Write(label) for label in self.labels], run_time=self.diagram_run_time)
 
     def draw_single_gate(self, label, qubit_index, x_shift):
-        gate = Square(side_length=0.7, color=BLUE).move_to(
+        # Square + label copied from a cached template (no text layout per gate)
+        return gate_glyph(label, font_size=24, color=BLUE).move_to(
             self.qubits[qubit_index].get_start() + RIGHT * x_shift
         )
-        gate_label = Text(label, font_size=24).move_to(gate.get_center())
-        return VGroup(gate, gate_label)
 
     def draw_two_qubit_gate(
         self,
@@ -188,13 +385,10 @@ class QuantumCircuitScene(Scene):
             self.qubits[control_qubit].get_start() + RIGHT * x_shift
         )
         # Target square + symbol
-        target_square = Square(side_length=0.7, color=target_color).move_to(
+        target_gate = gate_glyph(target_symbol, font_size=24, color=target_color).move_to(
             self.qubits[target_qubit].get_start() + RIGHT * x_shift
         )
-        target_label = Text(target_symbol, font_size=24).move_to(
-            target_square.get_center()
-        )
-        target_gate = VGroup(target_square, target_label)
+        target_square = target_gate[0]
         # Connecting line
         line = Line(
             control_dot.get_center(),
@@ -204,54 +398,51 @@ class QuantumCircuitScene(Scene):
         return control_dot, line, target_gate
 
     def draw_and_animate_gates(self):
-        # Group gates by x_shift for parallel animation
-        gates_by_x = defaultdict(list)
-        for gate_info in self.circuit:
-            gates_by_x[gate_info["x_shift"]].append(gate_info)
-
+        # Gates sharing an x_shift are animated in parallel
         self.gates = VGroup()
-        for x_shift, gates in sorted(gates_by_x.items()):
+        for x_shift, gates in self.circuit.layers():
             animations = []
-            for gate_info in gates:
-                if gate_info["type"] in ["-SY", "SY", "H", "X", "M"]:
-                    for q in gate_info["qubits"]:
-                        g = self.draw_single_gate(gate_info["type"], q, x_shift)
+            for gate in gates:
+                gtype = self.circuit.gate_type(gate)
+                if gtype in ["-SY", "SY", "H", "X", "M"]:
+                    for q in self.circuit.gate_qubits(gate):
+                        g = self.draw_single_gate(gtype, q, x_shift)
                         self.gates.add(g)
                         animations.append(FadeIn(g))
-                elif gate_info["type"] == "CNOT" or gate_info["type"] == "CZ":
-                    control, target = gate_info["qubits"]
+                elif gtype == "CNOT" or gtype == "CZ":
+                    control, target = self.circuit.gate_qubits(gate)
                     target_gate, control_dot, line = self.draw_two_qubit_gate(
                         control,
                         target,
                         x_shift,
-                        target_symbol="X" if gate_info["type"] == "CNOT" else "Z",
+                        target_symbol="X" if gtype == "CNOT" else "Z",
                     )
                     self.gates.add(control_dot, target_gate)
                     animations.extend(
                         [FadeIn(control_dot), FadeIn(target_gate), ShowCreation(line)]
                     )
-            self.play(*animations, run_time=RUN_TIME)
+            self.play(*animations, run_time=self.diagram_run_time)
 
     def animate_qubit_states(self):
         qubit_dots = VGroup(
             *[Dot(color=YELLOW).move_to(q.get_start()) for q in self.qubits]
         )
-        self.play(*[FadeIn(dot) for dot in qubit_dots], run_time=RUN_TIME)
+        self.play(*[FadeIn(dot) for dot in qubit_dots], run_time=self.diagram_run_time)
         self.play(
             *[
                 dot.animate.move_to(q.get_end())
                 for dot, q in zip(qubit_dots, self.qubits)
             ],
             # run_time=3,
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
 
-    def collapse_and_split(
-        self,
-        image_path="/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/blue/blue_0.png",
-    ):
-        # 1️⃣ Create middle IMAGE at origin
-        middle_image = ImageMobject(image_path).move_to(ORIGIN)
+    def collapse_and_split(self, sprite_name="blue/blue_0"):
+        # 1️⃣ Create middle IMAGE at origin (from the atlas, so it can Transform
+        # straight into the grid sprites in create_qubit_grid)
+        middle_image = AtlasImageMobject(
+            sprite_name, frame_height=self.camera.frame.get_height() * 0.2
+        ).move_to(ORIGIN)
         self.add(middle_image)
 
         # 2️⃣ Animate all qubit-related objects scaling down to middle image
@@ -263,14 +454,15 @@ class QuantumCircuitScene(Scene):
                 obj.animate.move_to(middle_image.get_center()).scale(0).set_opacity(0)
             )
 
-        if collapse_anims:
-            self.play(
-                self.camera.frame.animate.scale(0.2).move_to(
-                    middle_image.get_center() + UP * 0.1
-                ),
-                *collapse_anims,
-                run_time=2.5,
-            )
+        # Zoom in even with nothing to collapse (construct_streamed starts empty):
+        # create_qubit_grid and restore_layer size sprites for this frame
+        self.play(
+            self.camera.frame.animate.scale(0.2).move_to(
+                middle_image.get_center() + UP * 0.1
+            ),
+            *collapse_anims,
+            run_time=2.5,
+        )
 
         self.wait(0.5)
 
@@ -294,14 +486,12 @@ class QuantumCircuitScene(Scene):
             run_time=0.5,
         )
 
-    def create_qubit_grid(
-        self,
-        image_path="/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/blue/blue_0.png",
-        image_scale=0.5,
-        max_cols=7,
-    ):
+    def qubit_grid_layout(self, image_scale=0.5, max_cols=7):
+        """
+        Returns (positions, scale_factor): the centered grid position of every
+        qubit and the camera zoom that shows the entire grid.
+        """
         n_qubits = self.n_qubits
-        self.qubit_images = Group()
 
         # 1️⃣ Determine columns and rows
         cols = min(n_qubits, max_cols)
@@ -311,18 +501,7 @@ class QuantumCircuitScene(Scene):
         spacing_x = 1
         spacing_y = 1
 
-        # 3️⃣ Create qubit images and center the grid
-        for i in range(n_qubits):
-            row = i // cols
-            col = i % cols
-            x = (col - (cols - 1) / 2) * spacing_x
-            y = ((rows - 1) / 2 - row) * spacing_y
-            pos = np.array([x, y, 0])
-            img = ImageMobject(image_path).scale(image_scale).move_to(pos)
-            self.qubit_asset_paths[i] = image_path
-            self.qubit_images.add(img)
-
-        # 4️⃣ Adjust camera to show entire grid
+        # 3️⃣ Work out the camera zoom that shows the entire grid
         grid_width = (cols - 1) * spacing_x + image_scale * 2
         grid_height = (rows - 1) * spacing_y + image_scale * 2
 
@@ -332,6 +511,40 @@ class QuantumCircuitScene(Scene):
         scale_factor = max(
             grid_width / camera_frame_width, grid_height / camera_frame_height
         )
+
+        index = np.arange(n_qubits)
+        row, col = index // cols, index % cols
+        positions = np.zeros((n_qubits, 3))
+        positions[:, 0] = (col - (cols - 1) / 2) * spacing_x
+        positions[:, 1] = ((rows - 1) / 2 - row) * spacing_y
+        return positions, scale_factor
+
+    def create_qubit_grid(
+        self,
+        sprite_name="blue/blue_0",
+        image_scale=0.5,
+        max_cols=7,
+    ):
+        n_qubits = self.n_qubits
+        self.qubit_images = Group()
+
+        # 1️⃣ - 3️⃣ Grid positions and the camera zoom that shows them all
+        positions, scale_factor = self.qubit_grid_layout(image_scale, max_cols)
+        camera_frame_height = self.camera.frame.get_height()
+
+        # 4️⃣ Create qubit images (sized for that zoom) and center the grid
+        for i, pos in enumerate(positions):
+            img = AtlasImageMobject(
+                sprite_name,
+                scale=image_scale,
+                frame_height=camera_frame_height * scale_factor,
+            ).move_to(pos)
+            self.qubit_state.set_positions([i], pos)
+            self.qubit_images.add(img)
+        grid_color, grid_level = parse_sprite_path(sprite_name)
+        if grid_color is not None:
+            self.qubit_state.set_sprites(range(n_qubits), grid_color, grid_level)
+
         self.camera.frame.scale(scale_factor)
         self.play(
             self.camera.frame.animate.move_to(ORIGIN),
@@ -363,9 +576,9 @@ class QuantumCircuitScene(Scene):
 
     def troll_flash_and_replace_qubits(
         self,
-        new_image_path="/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/blue/blue_50.png",
+        new_image_path=TROLL_SPRITE,
         qubit_image_scale=0.5,
-        troll_image_path="/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/extras/idium_dad.png",
+        troll_image_path=os.path.join(ASSET_DIR, "extras", "idium_dad.png"),
         troll_scale=0.6,
         troll_text="You shall not pass!",
     ):
@@ -383,7 +596,7 @@ class QuantumCircuitScene(Scene):
         # 2️⃣ Troll and bubble setup
         # -------------------------------
         troll = ImageMobject(troll_image_path).scale(troll_scale)
-        text = Text(troll_text, font_size=36, color=BLACK)
+        text = cached_text(troll_text, font_size=36, color=BLACK)
         bubble = SurroundingRectangle(
             text, buff=0.1, fill_color=WHITE, fill_opacity=0, stroke_color=WHITE
         )
@@ -400,7 +613,7 @@ class QuantumCircuitScene(Scene):
             FadeIn(troll, shift=UP),
             GrowFromCenter(bubble),
             Write(text),
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
         self.wait(1)
 
@@ -414,7 +627,7 @@ class QuantumCircuitScene(Scene):
             FadeIn(troll, shift=UP),
             GrowFromCenter(bubble),
             Write(text),
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
         self.remove(troll, bubble, text, dimmer, red_flash)
         self.play(red_flash.animate.set_opacity(0), run_time=0.15)
@@ -428,7 +641,11 @@ class QuantumCircuitScene(Scene):
             new_img = ImageMobject(new_image_path).scale(qubit_image_scale)
             new_wrapper = Group(new_img).move_to(pos).set_opacity(0)
             new_qubit_wrappers.add(new_wrapper)
-            self.qubit_asset_paths[self.qubit_images.index(wrapper)] = new_image_path
+        new_color, new_level = parse_sprite_path(new_image_path)
+        if new_color is not None:
+            self.qubit_state.set_sprites(
+                range(len(new_qubit_wrappers)), new_color, new_level
+            )
         for i in range(self.qubit_images.__len__()):
             self.remove(self.qubit_images[i])
         self.add(new_qubit_wrappers)
@@ -439,7 +656,7 @@ class QuantumCircuitScene(Scene):
         # -------------------------------
         self.play(
             *[wrapper.animate.set_opacity(1) for wrapper in self.qubit_images],
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
 
     def wizard_spell_between_lists(
@@ -448,8 +665,8 @@ class QuantumCircuitScene(Scene):
         list2,
         move_offset=np.array([0.5, 0, 0]),
         run_time=1.5,
-        state_level=50,
-        color_name="orange",
+        state_level=SPELL_LEVEL,
+        color_name=SPELL_COLOR,
         image_scale=0.5,
     ):
         """
@@ -469,69 +686,41 @@ class QuantumCircuitScene(Scene):
         ]
         self.play(*anims_move, run_time=run_time)
 
-        # 3️⃣ Cast spells
-        spell_lines = []
-        anims_pulse = []
-        anims_fade = []
-
+        # 3️⃣ Cast spells, every pair's line in one mobject
         for i, j in zip(list1, list2):
-            q1 = self.qubit_images[i]
-            q2 = self.qubit_images[j]
             self.update_wizard_images(
                 [i, j],
                 state_level=state_level,
                 color_name=color_name,
                 image_scale=image_scale,
             )
-
-            start = q1.get_center()
-            end = q2.get_center()
-
-            # Wavy spell line
-            num_points = 20
-            curve_points = [
-                start
-                + (end - start) * t
-                + np.array([0, 0.1 * np.sin(10 * t * np.pi), 0])
-                for t in np.linspace(0, 1, num_points)
-            ]
-            spell_line = VMobject()
-            spell_line.set_points_as_corners(curve_points)
-            spell_line.set_stroke(color=BLUE, width=3)
-            spell_line.set_opacity(1.0)
-            self.add(spell_line)
-            spell_lines.append(spell_line)
-
-            anims_pulse.append(spell_line.animate.set_color(YELLOW).scale(1.2))
-            anims_fade.append(spell_line.animate.set_opacity(0.2))
-
-            # -------------------------
-            # Call the separate function here
-            # -------------------------
+        spells = SpellCurves(
+            [self.qubit_images[i].get_center() for i in list1],
+            [self.qubit_images[j].get_center() for j in list2],
+        )
+        self.add(spells)
 
         # Animate spells pulsing
-        self.play(*anims_pulse, rate_func=there_and_back, run_time=1.5)
+        self.play(spells.pulse(), rate_func=there_and_back, run_time=1.5)
         # Animate spells fading
-        self.play(*anims_fade, run_time=0.5)
+        self.play(spells.fade(), run_time=0.5)
 
         # Remove spell lines
-        for spell_line in spell_lines:
-            self.remove(spell_line)
-
-        # 4️⃣ Small swirl for all qubits
-        swirl_anims = []
-        for img in self.qubit_images:
-            original_pos = img.get_center()
-            swirl_path = [
-                original_pos + np.array([0.05, 0.05, 0]),
-                original_pos + np.array([-0.05, 0.05, 0]),
-                original_pos + np.array([-0.05, -0.05, 0]),
-                original_pos + np.array([0.05, -0.05, 0]),
-                original_pos,
-            ]
-            for next_pos in swirl_path:
-                swirl_anims.append(img.animate.move_to(next_pos))
-        self.play(*swirl_anims, run_time=1.5)
+        self.remove(spells)
+
+        # 4️⃣ Small swirl for all qubits, each along its own waypoints
+        centers = np.array([img.get_center() for img in self.qubit_images])
+        swirl_path = np.array([
+            [0, 0, 0],
+            [0.05, 0.05, 0],
+            [-0.05, 0.05, 0],
+            [-0.05, -0.05, 0],
+            [0.05, -0.05, 0],
+            [0, 0, 0],
+        ])
+        self.play(
+            follow_paths(self.qubit_images, centers[:, None] + swirl_path), run_time=1.5
+        )
 
         # 5️⃣ Return list1 qubits to original positions
         anims_return = [
@@ -541,20 +730,15 @@ class QuantumCircuitScene(Scene):
         self.play(*anims_return, run_time=run_time)
 
     def update_wizard_images(self, indices, state_level, color_name, image_scale=0.5):
-        path_template = "/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/{}/{}_{}.png"
-
         for i in indices:
             old_img = self.qubit_images[i]  # get the old ImageMobject
             current_color, current_level = self.get_current_color_and_level(i)
             if current_level is not None:
                 state_level = current_level
-            image_path = path_template.format(color_name, color_name, state_level)
-            new_img = (
-                ImageMobject(image_path)
-                .scale(image_scale)
-                .move_to(old_img.get_center())
-            )
-            self.qubit_asset_paths[i] = image_path
+            new_img = get_wizard_sprite(
+                color_name, state_level, image_scale, self.camera.frame.get_height()
+            ).move_to(old_img.get_center())
+            self.qubit_state.set_sprites([i], color_name, state_level)
 
             self.remove(old_img)
             self.qubit_images.submobjects[i] = new_img
@@ -570,10 +754,13 @@ class QuantumCircuitScene(Scene):
         state_levels=None,
         color_names=None,
         image_scale=0.5,
+        absolute_levels=False,
     ):
         """
         Apply single-qubit wizard operations to multiple qubits **in parallel**.
         Sparks, image replacement, and smile updates happen together.
+        state_levels are added to each qubit's level, or replace it when
+        absolute_levels is True (simulated levels).
         """
         if len(qubit_indices) != len(operations):
             raise ValueError("qubit_indices and operations must have the same length")
@@ -582,55 +769,36 @@ class QuantumCircuitScene(Scene):
         if color_names is None:
             color_names = ["orange"] * len(qubit_indices)
 
-        path_template = "/Users/antoine/Developpement/Quera_challenge/endofaquera/handdrawn_assets/{}/{}_{}.png"
-
         new_images = []
-        all_sparks = []
 
-        # 1️⃣ Create all new images and sparks
+        # Update the whole layer's state in one batch; wizards keep their color
+        state = self.qubit_state
+        color_names = [
+            state.color_name(i) or color for i, color in zip(qubit_indices, color_names)
+        ]
+        if absolute_levels:
+            levels = state.set_levels(qubit_indices, state_levels)
+        else:
+            levels = state.apply_level_deltas(qubit_indices, state_levels)
+        state.set_sprites(qubit_indices, color_names, levels)
+
+        # 1️⃣ Create all new images
         for i, op, level, color in zip(
-            qubit_indices, operations, state_levels, color_names
+            qubit_indices, operations, state.sprite_level[qubit_indices], color_names
         ):
             old_img = self.qubit_images[i]
-            current_color, get_current_level = self.get_current_color_and_level(i)
-            if current_color is not None:
-                color = current_color
-            level = level + self.qubit_levels[i]
-            if level > 100 or level < -100:
-                level = level % 100
-            self.qubit_levels[i] = level
-            image_path = path_template.format(color, color, abs(level))
-            new_img = (
-                ImageMobject(image_path)
-                .scale(image_scale)
-                .move_to(old_img.get_center())
-            )
-            self.qubit_asset_paths[i] = image_path
+            new_img = get_wizard_sprite(
+                color, level, image_scale, self.camera.frame.get_height()
+            ).move_to(old_img.get_center())
             new_img.set_color(color.upper())
             new_images.append((i, old_img, new_img))
 
-            # Sparks
-            spark_count = 6
-            sparks = VGroup()
-            for _ in range(spark_count):
-                offset = np.array(
-                    [np.random.uniform(-0.15, 0.15), np.random.uniform(-0.15, 0.15), 0]
-                )
-                spark = Dot(radius=0.05, color=YELLOW).move_to(
-                    new_img.get_center() + offset
-                )
-                sparks.add(spark)
-                self.add(spark)
-            all_sparks.append(sparks)
-
-        # 3️⃣ Animate all sparks in parallel
-        spark_anims = [
-            spark.animate.scale(2).set_opacity(0)
-            for sparks in all_sparks
-            for spark in sparks
-        ]
-
-        self.play(*spark_anims, run_time=0.5, rate_func=there_and_back)
+        # 3️⃣ Animate all sparks in parallel, as one point cloud
+        sparks = SparkBurst(
+            [new_img.get_center() for _, _, new_img in new_images], rng=self.spark_rng
+        )
+        self.add(sparks)
+        self.play(sparks.burst(), run_time=0.5, rate_func=there_and_back)
 
         # 2️⃣ Replace all old images at once
         for i, old_img, new_img in new_images:
@@ -639,9 +807,7 @@ class QuantumCircuitScene(Scene):
             self.add(new_img)
 
         # 4️⃣ Remove all sparks
-        for sparks in all_sparks:
-            for spark in sparks:
-                self.remove(spark)
+        self.remove(sparks)
 
     def create_smile(self, alpha, beta, width=0.5):
         """
@@ -664,21 +830,33 @@ class QuantumCircuitScene(Scene):
         smile.set_stroke(width=2, color=YELLOW)
         return smile
 
+    def update_smiles(self, p1, run_time=0.3):
+        """
+        Redraws each wizard's smile from |alpha| = sqrt(P(0)), |beta| = sqrt(P(1)),
+        animating only the smiles whose probability changed.
+        """
+        p1 = np.clip(p1, 0, 1)
+        smiles = [
+            self.create_smile(np.sqrt(1 - p), np.sqrt(p)).next_to(img, DOWN, buff=0.05)
+            for p, img in zip(p1, self.qubit_images)
+        ]
+        if self.qubit_smiles is None:
+            self.qubit_smiles = VGroup(*smiles)
+            self.smile_p1 = p1
+            self.play(FadeIn(self.qubit_smiles), run_time=run_time)
+            return
+
+        changed = np.flatnonzero(~np.isclose(p1, self.smile_p1))
+        self.smile_p1 = p1
+        if len(changed):
+            self.play(
+                *[Transform(self.qubit_smiles[i], smiles[i]) for i in changed],
+                run_time=run_time,
+            )
+
     def get_current_color_and_level(self, qubit_index):
         """
         Returns the current color name and state level for the given qubit index
-        based on the stored asset path.
+        from the qubit state store.
         """
-        path = self.qubit_asset_paths[qubit_index]
-        if path is None:
-            return None, None
-        # Extract color name and level from the file path
-        parts = os.path.basename(path).split("_")
-        if len(parts) <= 3:
-            color_name = parts[0]
-            try:
-                state_level = int(parts[1].split(".")[0])  # remove file extension
-            except ValueError:
-                state_level = None
-            return color_name, state_level
-        return None, None
+        return self.qubit_state.color_and_level(qubit_index)
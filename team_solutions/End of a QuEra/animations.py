@@ -1,10 +1,26 @@
 from manimlib import *
 from collections import defaultdict
+import sys
+import os
 
-RUN_TIME = 0.01
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared scene mixins and simulators live with the challenge assets
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets"))
 
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
+
+
+class QuantumCircuitScene(ProfiledSceneMixin, TimedSceneMixin, Scene):
+    # Quick circuit phases (scaled by the timing profile)
+    diagram_run_time = 0.01
+    # Phases the render profiler times (see render_profiler.py)
+    profiled_methods = (
+        "construct", "draw_qubits", "draw_qubit_labels", "draw_and_animate_gates",
+        "animate_qubit_states", "collapse_and_split", "create_qubit_grid",
+        "show_troll_with_bubble", "flash_red_and_replace_qubits",
+    )
 
-class QuantumCircuitScene(Scene):
     def construct(self):
         # Parameters
         self.n_qubits = 3
@@ -42,7 +58,7 @@ class QuantumCircuitScene(Scene):
             line = Line(LEFT * 5, LEFT * 5 + RIGHT * last_gate_x[i])
             self.qubits.add(line)
         self.qubits.arrange(DOWN, buff=1.5).to_edge(LEFT, buff=1)
-        self.play(*[ShowCreation(q) for q in self.qubits], run_time=RUN_TIME)
+        self.play(*[ShowCreation(q) for q in self.qubits], run_time=self.diagram_run_time)
 
     # -------------------------
     # Phase 2: Qubit labels
@@ -54,7 +70,7 @@ class QuantumCircuitScene(Scene):
                 for i in range(self.n_qubits)
             ]
         )
-        self.play(*[Write(label) for label in self.labels], run_time=RUN_TIME)
+        self.play(*[Write(label) for label in self.labels], run_time=self.diagram_run_time)
 
     # -------------------------
     # Phase 3: Gate drawing helpers
@@ -122,7 +138,7 @@ class QuantumCircuitScene(Scene):
                     animations.extend(
                         [FadeIn(control_dot), FadeIn(target_gate), ShowCreation(line)]
                     )
-            self.play(*animations, run_time=RUN_TIME)
+            self.play(*animations, run_time=self.diagram_run_time)
 
     # -------------------------
     # Phase 5: Animate qubit states
@@ -131,14 +147,14 @@ class QuantumCircuitScene(Scene):
         qubit_dots = VGroup(
             *[Dot(color=YELLOW).move_to(q.get_start()) for q in self.qubits]
         )
-        self.play(*[FadeIn(dot) for dot in qubit_dots], run_time=RUN_TIME)
+        self.play(*[FadeIn(dot) for dot in qubit_dots], run_time=self.diagram_run_time)
         self.play(
             *[
                 dot.animate.move_to(q.get_end())
                 for dot, q in zip(qubit_dots, self.qubits)
             ],
             # run_time=3,
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
 
     def collapse_and_split(
@@ -291,7 +307,7 @@ class QuantumCircuitScene(Scene):
         # Ensure the dimmer is ABOVE the grid but BELOW the troll
         # (Manim adds new objects on top by default)
 
-        self.play(FadeIn(self.dimmer), run_time=RUN_TIME)
+        self.play(FadeIn(self.dimmer), run_time=self.diagram_run_time)
         # ---------------------------------------------------------
         # Troll Setup
         # ---------------------------------------------------------
@@ -318,8 +334,8 @@ class QuantumCircuitScene(Scene):
         self.text.move_to(self.bubble.get_center())
 
         # Animate Troll and Bubble appearing ON TOP of the dimmer
-        self.play(FadeIn(self.troll, shift=UP), run_time=RUN_TIME)
-        self.play(GrowFromCenter(self.bubble), Write(self.text), run_time=RUN_TIME)
+        self.play(FadeIn(self.troll, shift=UP), run_time=self.diagram_run_time)
+        self.play(GrowFromCenter(self.bubble), Write(self.text), run_time=self.diagram_run_time)
 
         self.wait(2)
 
@@ -365,7 +381,7 @@ class QuantumCircuitScene(Scene):
         # 5️⃣ Animate new images appearing
         self.play(
             *[wrapper.animate.set_opacity(1) for wrapper in self.qubit_images],
-            run_time=RUN_TIME,
+            run_time=self.diagram_run_time,
         )
 
     def wizard_spell_between_lists(
@@ -0,0 +1,82 @@
+"""
+AtlasImageMobject: an ImageMobject that draws one sprite out of the shared
+handdrawn_assets atlas (see sprite_atlas.py).
+
+Works with whichever backend the scene imported first: manimlib scenes sample
+a sub-rectangle of one GPU texture (every sprite of a level shares the atlas
+path, and manimlib already caches one texture per path), manim CE scenes
+hold a view into the one decoded atlas array.
+
+Passing `scale` applies it right away and lets the sprite come from the
+smallest mip level that still covers its on-screen size at the active quality
+preset (pass `frame_height` too if the camera is zoomed).
+"""
+import sys
+
+from sprite_atlas import load_atlas
+from sprite_mipmaps import choose_mip_level
+
+
+def pick_atlas(name, world_height, frame_height=None):
+    source_height = load_atlas(0).source_size(name)[1]
+    return load_atlas(choose_mip_level(source_height, world_height, frame_height))
+
+
+if "manimlib" in sys.modules:
+    from manimlib import ImageMobject
+
+    class AtlasImageMobject(ImageMobject):
+        def __init__(self, name, scale=1.0, frame_height=None, atlas=None, height=4.0, **kwargs):
+            self.atlas = atlas or pick_atlas(name, height * scale, frame_height)
+            self.sprite = name
+            self.uv_rect = self.atlas.uv_rect(name)
+            super().__init__(self.atlas.image_path, height=height, **kwargs)
+            self.scale(scale)
+
+        def init_data(self):
+            super().init_data()
+            u0, v0, u1, v1 = self.uv_rect
+            self.data["im_coords"][:] = [
+                (u0, v0), (u0, v1), (u1, v0), (u1, v1), (u1, v0), (u0, v1)
+            ]
+
+        def init_points(self):
+            w, h = self.atlas.source_size(self.sprite)
+            self.set_width(2 * w / h, stretch=True)
+            self.set_height(self.height)
+
+else:
+    from manim import ImageMobject, config
+    from manim.constants import DEFAULT_QUALITY, QUALITIES
+
+    class AtlasImageMobject(ImageMobject):
+        def __init__(self, name, scale=1.0, frame_height=None, atlas=None, **kwargs):
+            w0, h0 = load_atlas(0).source_size(name)
+            resolution = kwargs.pop(
+                "scale_to_resolution", QUALITIES[DEFAULT_QUALITY]["pixel_height"]
+            )
+            natural_height = h0 / resolution * config["frame_height"]
+
+            self.atlas = atlas or pick_atlas(name, natural_height * scale, frame_height)
+            self.sprite = name
+            view = self.atlas.sprite_pixels(name)
+            super().__init__(view, scale_to_resolution=resolution, **kwargs)
+            # ImageMobject copied the pixels; point back at the shared atlas
+            self.pixel_array = view
+            # Keep the full-resolution size no matter which mip level was used
+            self.stretch_to_fit_height(natural_height)
+            self.stretch_to_fit_width(natural_height * w0 / h0)
+            self.scale(scale)
+
+        def own_pixels(self):
+            # Copy-on-write: set_color / set_opacity edit pixels in place
+            if self.pixel_array.base is not None:
+                self.pixel_array = self.pixel_array.copy()
+
+        def set_color(self, *args, **kwargs):
+            self.own_pixels()
+            return super().set_color(*args, **kwargs)
+
+        def set_opacity(self, alpha):
+            self.own_pixels()
+            return super().set_opacity(alpha)
@@ -1,14 +1,32 @@
 from manim import *
 import numpy as np
 from pathlib import Path
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared scene mixins and simulators live with the challenge assets
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets"))
+
+from atlas_mobject import AtlasImageMobject
+from text_cache import cached_text
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
 
 ASSETS = Path("handdrawn_assets")
 WIZARD = ASSETS / "neutral_wizard_orange.png"
+WIZARD_SPRITE = "neutral_wizard_orange"  # WIZARD inside the shared sprite atlas
+
+class ZonedQubitArchitecture(ProfiledSceneMixin, TimedSceneMixin, MovingCameraScene):
+    # Slowdown on top of the timing profile
+    time_scale = 1.1
+    # Phases the render profiler times (see render_profiler.py)
+    profiled_methods = (
+        "construct", "create_zones", "create_storage_qubits", "move_qubits_smoothly",
+        "zoom_into_entanglement", "show_entanglement_pairs", "zoom_back_out",
+        "zoom_into_readout",
+    )
 
-# Global slowdown factor
-SLOW = 1.1
-
-class ZonedQubitArchitecture(MovingCameraScene):
     def construct(self):
         self.create_zones()
         self.create_storage_qubits(24)  # total qubits: 24
@@ -37,9 +55,9 @@ class ZonedQubitArchitecture(MovingCameraScene):
             width=box_w, height=box_h, stroke_color=GREEN
         ).move_to(RIGHT * 3.2 + DOWN * 2.2)
 
-        self.storage_label = Text("Storage", font_size=28).next_to(self.storage_box, UP)
-        self.entangle_label = Text("Entanglement", font_size=28).next_to(self.entangle_box, UP)
-        self.readout_label = Text("Readout", font_size=28).next_to(self.readout_box, UP)
+        self.storage_label = cached_text("Storage", font_size=28).next_to(self.storage_box, UP)
+        self.entangle_label = cached_text("Entanglement", font_size=28).next_to(self.entangle_box, UP)
+        self.readout_label = cached_text("Readout", font_size=28).next_to(self.readout_box, UP)
 
         animations = [
             Create(self.storage_box),
@@ -50,7 +68,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
             FadeIn(self.readout_label),
         ]
         if animations:
-            self.play(*animations, run_time=2*SLOW)
+            self.play(*animations, run_time=2)
 
     # --------------------------------------------------
     # CREATE QUBITS
@@ -60,6 +78,10 @@ class ZonedQubitArchitecture(MovingCameraScene):
         rows, cols = 4, 6
         spacing = 0.65
         center = self.storage_box.get_center()
+        # Wizards are seen up close when the camera zooms into a zone box
+        zoomed_frame_height = (
+            self.camera.frame.height * self.entangle_box.width * 1.4 / self.camera.frame.width
+        )
 
         for i in range(n):
             r, c = divmod(i, cols)
@@ -68,11 +90,13 @@ class ZonedQubitArchitecture(MovingCameraScene):
                 (rows / 2 - r - 0.5) * spacing,
                 0
             ])
-            wiz = ImageMobject(WIZARD).scale(0.32).move_to(pos)
+            wiz = AtlasImageMobject(
+                WIZARD_SPRITE, scale=0.32, frame_height=zoomed_frame_height
+            ).move_to(pos)
             self.qubits.add(wiz)
 
         if len(self.qubits) > 0:
-            self.play(FadeIn(self.qubits), run_time=2*SLOW)
+            self.play(FadeIn(self.qubits), run_time=2)
 
     # --------------------------------------------------
     # SHUTTLING QUBITS
@@ -106,7 +130,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
                 animations.append(wiz.animate.move_to(storage_positions[j]))
 
         if animations:
-            self.play(*animations, run_time=4*SLOW, rate_func=smooth)
+            self.play(*animations, run_time=4, rate_func=smooth)
 
     # --------------------------------------------------
     # CAMERA: ENTANGLEMENT (sped up 30%)
@@ -116,7 +140,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
         zoom_width = self.entangle_box.width * 1.4
         self.play(
             self.camera.frame.animate.move_to(target).set(width=zoom_width),
-            run_time=3*SLOW*0.7,  # 30% faster
+            run_time=3*0.7,  # 30% faster
             rate_func=smooth
         )
 
@@ -131,7 +155,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
         for i, q in enumerate(qubits):
             col = i % cols
             color = RED if col % 2 == 0 else BLUE
-            self.play(q.animate.set_color(color), run_time=0.5*SLOW*0.7)
+            self.play(q.animate.set_color(color), run_time=0.5*0.7)
 
         # Step 2: draw yellow lines row-wise connecting pairs
         lines = []
@@ -150,10 +174,10 @@ class ZonedQubitArchitecture(MovingCameraScene):
 
         # Step 3: animate lines and turn connected qubits purple
         for line, pair in lines:
-            self.play(Create(line), run_time=1.0*SLOW*0.7)
-            self.play(*[q.animate.set_color(PURPLE) for q in pair], run_time=0.6*SLOW*0.7)
+            self.play(Create(line), run_time=1.0*0.7)
+            self.play(*[q.animate.set_color(PURPLE) for q in pair], run_time=0.6*0.7)
 
-        self.wait(0.5*SLOW*0.7)
+        self.wait(0.5*0.7)
 
     # --------------------------------------------------
     # CAMERA: ZOOM BACK OUT
@@ -161,7 +185,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
     def zoom_back_out(self):
         self.play(
             self.camera.frame.animate.move_to(ORIGIN).set(width=14),
-            run_time=3*SLOW,
+            run_time=3,
             rate_func=smooth
         )
 
@@ -175,7 +199,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
         # Zoom camera
         self.play(
             self.camera.frame.animate.move_to(target).set(width=zoom_width),
-            run_time=3*SLOW,
+            run_time=3,
             rate_func=smooth
         )
 
@@ -192,7 +216,7 @@ class ZonedQubitArchitecture(MovingCameraScene):
             if len(highlights) > 0:
                 self.play(
                     LaggedStartMap(FadeIn, highlights, lag_ratio=0.4),
-                    run_time=2.5*SLOW
+                    run_time=2.5
                 )
 
     # --------------------------------------------------
@@ -0,0 +1,123 @@
+import numpy as np
+
+GATE_TYPES = ("SY", "-SY", "H", "X", "M", "CZ", "CNOT", "TROLL", "BARRIER")
+OPCODES = {name: i for i, name in enumerate(GATE_TYPES)}
+
+SY, MINUS_SY, H, X, M, CZ, CNOT, TROLL, BARRIER = range(len(GATE_TYPES))
+WIZARD_SINGLE_QUBIT_OPS = np.array([SY, MINUS_SY, H])
+TWO_QUBIT_OPS = np.array([CZ, CNOT])
+
+
+class CompactCircuit:
+    """
+    Columnar circuit representation shared by every QuantumCircuitScene phase.
+
+    Gates are stored as parallel NumPy arrays:
+    - opcode:    int8 index into GATE_TYPES
+    - qubit_ptr: CSR offsets, gate g acts on qubits[qubit_ptr[g]:qubit_ptr[g + 1]]
+    - qubits:    flat int32 operand list
+    - x_shift:   horizontal position of the gate (gates sharing it run in parallel)
+    - layer:     dense rank of x_shift
+
+    `order` lists gate indices sorted by layer (stable, so gates in a layer keep
+    their input order) and `layer_offsets` delimits each layer inside it; both
+    are built in one pass when the circuit is created.
+    """
+
+    def __init__(self, opcode, qubit_ptr, qubits, x_shift):
+        self.opcode = np.asarray(opcode, dtype=np.int8)
+        self.qubit_ptr = np.asarray(qubit_ptr, dtype=np.int64)
+        self.qubits = np.asarray(qubits, dtype=np.int32)
+        self.x_shift = np.asarray(x_shift, dtype=np.float64)
+        self.build_layers()
+
+    @classmethod
+    def from_dicts(cls, gates):
+        """
+        Builds a circuit from [{"type": ..., "qubits": [...], "x_shift": ...}, ...].
+        Gates without an x_shift get their list index (one gate per layer) until
+        the scheduler assigns real layers.
+        """
+        arity = np.fromiter((len(g["qubits"]) for g in gates), dtype=np.int64, count=len(gates))
+        qubit_ptr = np.zeros(len(gates) + 1, dtype=np.int64)
+        np.cumsum(arity, out=qubit_ptr[1:])
+        return cls(
+            opcode=[OPCODES[g["type"]] for g in gates],
+            qubit_ptr=qubit_ptr,
+            qubits=[q for g in gates for q in g["qubits"]],
+            x_shift=[g.get("x_shift", i) for i, g in enumerate(gates)],
+        )
+
+    def build_layers(self):
+        self.layer_x, self.layer = np.unique(self.x_shift, return_inverse=True)
+        self.order = np.argsort(self.layer, kind="stable")
+        self.layer_offsets = np.zeros(len(self.layer_x) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.layer, minlength=len(self.layer_x)), out=self.layer_offsets[1:])
+
+    def __len__(self):
+        return len(self.opcode)
+
+    @property
+    def n_layers(self):
+        return len(self.layer_x)
+
+    @property
+    def arity(self):
+        return np.diff(self.qubit_ptr)
+
+    # -----------------------------
+    # Per-gate access
+    # -----------------------------
+    def gate_type(self, g):
+        return GATE_TYPES[self.opcode[g]]
+
+    def gate_qubits(self, g):
+        return self.qubits[self.qubit_ptr[g]:self.qubit_ptr[g + 1]].tolist()
+
+    def take(self, gates, x_shift=None):
+        """A circuit holding only `gates`, in that order (with new x_shift if given)."""
+        gates = np.asarray(gates, dtype=np.int64)
+        qubits, _ = self.expand(gates)
+        qubit_ptr = np.zeros(len(gates) + 1, dtype=np.int64)
+        np.cumsum(self.arity[gates], out=qubit_ptr[1:])
+        return CompactCircuit(
+            self.opcode[gates], qubit_ptr, qubits,
+            self.x_shift[gates] if x_shift is None else x_shift,
+        )
+
+    def to_dicts(self):
+        return [
+            {"type": self.gate_type(g), "qubits": self.gate_qubits(g), "x_shift": self.x_shift[g]}
+            for g in range(len(self))
+        ]
+
+    # -----------------------------
+    # Layer access
+    # -----------------------------
+    def layers(self):
+        """Yields (x_shift, gate indices) for each layer in x order."""
+        for layer in range(self.n_layers):
+            start, stop = self.layer_offsets[layer], self.layer_offsets[layer + 1]
+            yield self.layer_x[layer], self.order[start:stop]
+
+    def expand(self, gates):
+        """
+        Flattens the operands of `gates`: returns (qubits, opcodes) with one entry
+        per (gate, qubit) pair.
+        """
+        gates = np.asarray(gates, dtype=np.int64)
+        counts = self.arity[gates]
+        starts = np.repeat(self.qubit_ptr[gates], counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.qubits[starts + within], np.repeat(self.opcode[gates], counts)
+
+    def select(self, gates, opcodes):
+        """The subset of `gates` whose opcode is in `opcodes`."""
+        gates = np.asarray(gates, dtype=np.int64)
+        return gates[np.isin(self.opcode[gates], opcodes)]
+
+    def last_gate_x(self, n_qubits):
+        """Largest x_shift of any gate touching each qubit (0 if untouched)."""
+        last = np.zeros(n_qubits, dtype=np.float64)
+        np.maximum.at(last, self.qubits, np.repeat(self.x_shift, self.arity))
+        return last
@@ -0,0 +1,173 @@
+"""
+Streaming circuit loaders for QuantumCircuitScene.
+
+Supported inputs:
+- OpenQASM 2/3 subset: qreg/qubit declarations, sy, sydg, h, x, cz, cx,
+  barrier and measure (both `measure q[0] -> c[0];` and `c[0] = measure q[0];`).
+  A barrier becomes a BARRIER op on the qubits it names, which the scheduler
+  and `stream_layers` never move gates across.
+- JSON Lines: one {"type": ..., "qubits": [...]} gate per line, optionally
+  preceded by a {"n_qubits": N} header line.
+
+Files are read line by line and gates come out as a generator, so
+`stream_layers` can hand the scene one parallel layer at a time while
+memory stays flat however long the circuit is.
+"""
+import json
+import re
+
+from circuit_ir import CompactCircuit
+
+QASM_GATES = {
+    "sy": "SY",
+    "sydg": "-SY",
+    "h": "H",
+    "x": "X",
+    "cz": "CZ",
+    "cx": "CNOT",
+    "cnot": "CNOT",
+    "barrier": "BARRIER",
+}
+QASM_SKIP = ("OPENQASM", "include", "creg", "bit", "//")
+
+_QREG = re.compile(r"^(?:qreg\s+(\w+)\s*\[(\d+)\]|qubit\s*\[(\d+)\]\s+(\w+))\s*;")
+_OPERAND = re.compile(r"(\w+)(?:\s*\[(\d+)\])?")
+
+
+class CircuitFormatError(ValueError):
+    pass
+
+
+def open_circuit(path):
+    """
+    Returns (n_qubits, gates) where gates lazily yields gate dicts. n_qubits is
+    None for JSON Lines files without a header.
+    """
+    if str(path).endswith((".qasm", ".qasm3")):
+        return _open_qasm(path)
+    return _open_jsonl(path)
+
+
+# -----------------------------
+# OpenQASM
+# -----------------------------
+def _open_qasm(path):
+    f = open(path)
+    registers = {}  # name -> (offset, size)
+    n_qubits = 0
+    pending = None
+
+    # Declarations come first: read until the first gate line
+    for line_no, line in enumerate(f, 1):
+        line = line.split("//")[0].strip()
+        if not line or line.startswith(QASM_SKIP):
+            continue
+        match = _QREG.match(line)
+        if match is None:
+            pending = (line_no, line)
+            break
+        name = match.group(1) or match.group(4)
+        size = int(match.group(2) or match.group(3))
+        registers[name] = (n_qubits, size)
+        n_qubits += size
+
+    return n_qubits, _qasm_gates(f, registers, pending, path)
+
+
+def _qasm_gates(f, registers, pending, path):
+    with f:
+        if pending is not None:
+            yield from _parse_qasm_line(*pending, registers, path)
+        for line_no, line in enumerate(f, pending[0] + 1 if pending else 1):
+            line = line.split("//")[0].strip()
+            if line and not line.startswith(QASM_SKIP):
+                yield from _parse_qasm_line(line_no, line, registers, path)
+
+
+def _parse_qasm_line(line_no, line, registers, path):
+    for statement in filter(None, (s.strip() for s in line.split(";"))):
+        if "measure" in statement:
+            # "measure q[0] -> c[0]" or "c[0] = measure q[0]"
+            target = statement.split("measure", 1)[1].split("->")[0]
+            yield {"type": "M", "qubits": _operands(target, registers, path, line_no)}
+            continue
+        name, _, args = statement.partition(" ")
+        if name not in QASM_GATES:
+            raise CircuitFormatError(f"{path}:{line_no}: unsupported statement {statement!r}")
+        qubits = _operands(args, registers, path, line_no)
+        gtype = QASM_GATES[name]
+        if gtype in ("CZ", "CNOT", "BARRIER"):
+            yield {"type": gtype, "qubits": qubits}
+        else:
+            # Single-qubit gates on a whole register broadcast
+            yield from ({"type": gtype, "qubits": [q]} for q in qubits)
+
+
+def _operands(text, registers, path, line_no):
+    qubits = []
+    for name, index in _OPERAND.findall(text):
+        if name not in registers:
+            raise CircuitFormatError(f"{path}:{line_no}: unknown register {name!r}")
+        offset, size = registers[name]
+        if index == "":
+            qubits.extend(range(offset, offset + size))
+        else:
+            qubits.append(offset + int(index))
+    return qubits
+
+
+# -----------------------------
+# JSON Lines
+# -----------------------------
+def _open_jsonl(path):
+    f = open(path)
+    first = f.readline()
+    header = json.loads(first) if first.strip() else {}
+    if "n_qubits" in header:
+        return header["n_qubits"], _jsonl_gates(f, None)
+    return None, _jsonl_gates(f, header or None)
+
+
+def _jsonl_gates(f, first_gate):
+    with f:
+        if first_gate is not None:
+            yield first_gate
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# -----------------------------
+# Layering
+# -----------------------------
+def stream_layers(gates, x_start=2, x_step=2):
+    """
+    Groups a gate stream into parallel layers on the fly: a layer is closed as
+    soon as a gate touches a qubit it already uses (or has no operands, like
+    TROLL). Yields one CompactCircuit per layer, with x_shift continuing the
+    scene's 2, 4, 6, ... spacing. Only the current layer is held in memory.
+
+    A BARRIER adds no gate; if the current layer already uses one of its
+    qubits, all of them count as used, so later gates on any of them start a
+    new layer.
+    """
+    layer, busy = [], set()
+    x_shift = x_start
+    for gate in gates:
+        qubits = gate["qubits"]
+        if gate["type"] == "BARRIER":
+            if busy.intersection(qubits):
+                busy.update(qubits)
+            continue
+        if layer and (not qubits or busy.intersection(qubits)):
+            yield CompactCircuit.from_dicts(layer)
+            layer, busy = [], set()
+            x_shift += x_step
+        layer.append({"type": gate["type"], "qubits": qubits, "x_shift": x_shift})
+        busy.update(qubits)
+        if not qubits:  # barriers get a layer of their own
+            yield CompactCircuit.from_dicts(layer)
+            layer, busy = [], set()
+            x_shift += x_step
+    if layer:
+        yield CompactCircuit.from_dicts(layer)
@@ -0,0 +1,46 @@
+"""
+Gate glyph templates for circuit diagrams.
+
+Laying out Text is the slow part of drawing a gate, so each distinct
+(label, font_size, color) glyph - a Square with its label centered on it - is
+built once and every gate instance gets a copy of the template. Copying only
+duplicates the point arrays, so a 1,000-gate diagram costs about as much text
+layout as its handful of distinct gate types.
+
+Works with whichever backend the scene imported first, like atlas_mobject.
+"""
+import sys
+
+from text_cache import cached_text
+
+if "manimlib" in sys.modules:
+    from manimlib import BLUE, Square, VGroup
+else:
+    from manim import BLUE, Square, VGroup
+
+
+class GateGlyphCache:
+    def __init__(self, side_length=0.7):
+        self.side_length = side_length
+        self.templates = {}
+
+    def template(self, label, font_size=24, color=BLUE):
+        key = (label, font_size, color)
+        if key not in self.templates:
+            square = Square(side_length=self.side_length, color=color)
+            self.templates[key] = VGroup(square, cached_text(label, font_size=font_size))
+        return self.templates[key]
+
+    def glyph(self, label, font_size=24, color=BLUE):
+        """A fresh VGroup(square, label) centered at the origin."""
+        return self.template(label, font_size, color).copy()
+
+    def clear(self):
+        self.templates.clear()
+
+
+GATE_GLYPHS = GateGlyphCache()
+
+
+def gate_glyph(label, font_size=24, color=BLUE):
+    return GATE_GLYPHS.glyph(label, font_size, color)
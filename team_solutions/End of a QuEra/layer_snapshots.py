@@ -0,0 +1,168 @@
+"""
+Per-layer state snapshots so a circuit animation can start at any layer.
+
+QuantumCircuitScene records the simulator and QubitStateStore arrays after
+every layer. Every `keyframe_every`-th layer is stored in full; the layers in
+between only keep the flat indices and values that changed since the previous
+layer, so a long circuit whose layers each touch a few qubits costs little
+more than its keyframes. A delta that would be larger than half the state is
+stored as a keyframe instead (dense statevector updates, for example).
+
+Snapshots are saved as one .npz per circuit (see `circuit_key`), so a later
+render can restore layer k directly instead of replaying everything before it.
+Pass `source_key(...)` of the recording code in the key so snapshots left by
+an older version of it are not reused.
+"""
+import hashlib
+import inspect
+import os
+
+import numpy as np
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".layer_snapshots")
+
+
+def circuit_key(circuit, n_qubits, *extra):
+    """Stable hash of a CompactCircuit (plus e.g. seed / simulator type)."""
+    digest = hashlib.sha1()
+    for array in (circuit.opcode, circuit.qubit_ptr, circuit.qubits, circuit.x_shift):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(repr((n_qubits,) + extra).encode())
+    return digest.hexdigest()[:16]
+
+
+def source_key(*objects):
+    """Hash of the source files defining `objects` (classes, functions or modules)."""
+    digest = hashlib.sha1()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def rng_state_array(rng):
+    """A PCG64 Generator's state as a uint64 array, so it can be snapshotted too."""
+    state = rng.bit_generator.state
+    words = [state["state"]["state"], state["state"]["inc"]]
+    return np.array(
+        [w >> shift & (2 ** 64 - 1) for w in words for shift in (64, 0)]
+        + [state["has_uint32"], state["uinteger"]],
+        dtype=np.uint64,
+    )
+
+
+def set_rng_state(rng, array):
+    hi_lo = [int(v) for v in array]
+    rng.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {
+            "state": hi_lo[0] << 64 | hi_lo[1],
+            "inc": hi_lo[2] << 64 | hi_lo[3],
+        },
+        "has_uint32": hi_lo[4],
+        "uinteger": hi_lo[5],
+    }
+
+
+class LayerSnapshots:
+    def __init__(self, keyframe_every=16):
+        self.keyframe_every = keyframe_every
+        self.shapes = {}  # name -> shape, fixed by the first record()
+        self.kinds = []  # "key" or "delta" per layer
+        self.frames = []  # {name: flat array} or {name: (indices, values)}
+        self._last = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def nbytes(self):
+        total = 0
+        for frame in self.frames:
+            for value in frame.values():
+                parts = value if isinstance(value, tuple) else (value,)
+                total += sum(part.nbytes for part in parts)
+        return total
+
+    def record(self, arrays):
+        """Appends the state after the next layer ({name: ndarray})."""
+        flat = {name: np.array(a).ravel() for name, a in arrays.items()}
+        if not self.shapes:
+            self.shapes = {name: np.shape(a) for name, a in arrays.items()}
+
+        if self._last is None or len(self.frames) % self.keyframe_every == 0:
+            self._append_key(flat)
+            return
+
+        delta = {}
+        changed = 0
+        for name, values in flat.items():
+            indices = np.flatnonzero(values != self._last[name])
+            delta[name] = (indices.astype(np.int32), values[indices])
+            changed += indices.size
+        if 2 * changed > sum(v.size for v in flat.values()):
+            self._append_key(flat)
+            return
+        self.kinds.append("delta")
+        self.frames.append(delta)
+        self._last = flat
+
+    def _append_key(self, flat):
+        self.kinds.append("key")
+        self.frames.append(flat)
+        self._last = flat
+
+    def truncate(self, n_layers):
+        """Drops every snapshot from layer `n_layers` on (they get re-recorded)."""
+        del self.kinds[n_layers:]
+        del self.frames[n_layers:]
+        self._last = None
+        if self.frames:
+            last = self.restore(len(self.frames) - 1)
+            self._last = {name: a.ravel() for name, a in last.items()}
+
+    def restore(self, layer):
+        """State after `layer` (0-based), rebuilt from the nearest keyframe."""
+        if not 0 <= layer < len(self.frames):
+            raise IndexError(f"No snapshot for layer {layer} ({len(self.frames)} recorded)")
+        key = max(i for i in range(layer + 1) if self.kinds[i] == "key")
+        state = {name: values.copy() for name, values in self.frames[key].items()}
+        for frame in self.frames[key + 1:layer + 1]:
+            for name, (indices, values) in frame.items():
+                state[name][indices] = values
+        return {name: state[name].reshape(shape) for name, shape in self.shapes.items()}
+
+    # -----------------------------
+    # Disk cache
+    # -----------------------------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {"kinds": np.array(self.kinds), "keyframe_every": self.keyframe_every}
+        for name, shape in self.shapes.items():
+            arrays[f"shape/{name}"] = np.array(shape, dtype=np.int64)
+        for i, frame in enumerate(self.frames):
+            for name, value in frame.items():
+                if isinstance(value, tuple):
+                    arrays[f"{i}/{name}/indices"], arrays[f"{i}/{name}/values"] = value
+                else:
+                    arrays[f"{i}/{name}"] = value
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            snapshots = cls(int(data["keyframe_every"]))
+            names = [k.split("/", 1)[1] for k in data.files if k.startswith("shape/")]
+            snapshots.shapes = {name: tuple(data[f"shape/{name}"]) for name in names}
+            snapshots.kinds = data["kinds"].tolist()
+            for i, kind in enumerate(snapshots.kinds):
+                if kind == "key":
+                    frame = {name: data[f"{i}/{name}"] for name in names}
+                else:
+                    frame = {
+                        name: (data[f"{i}/{name}/indices"], data[f"{i}/{name}/values"])
+                        for name in names
+                    }
+                snapshots.frames.append(frame)
+        snapshots.truncate(len(snapshots.frames))
+        return snapshots
@@ -1,7 +1,17 @@
 from manim import *
 import numpy as np
+import sys
+import os
 
-class RubidiumLaserTrap(Scene):
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared scene mixins and simulators live with the challenge assets
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets"))
+
+from text_cache import cached_text
+from render_profiler import ProfiledSceneMixin
+from timing import TimedSceneMixin
+
+class RubidiumLaserTrap(ProfiledSceneMixin, TimedSceneMixin, Scene):
     def construct(self):
 
         # -----------------------------
@@ -21,7 +31,7 @@ class RubidiumLaserTrap(Scene):
         electron.scale(0.7)
         electron.move_to(electron_orbit.point_at_angle(0))
 
-        electron_label = Text("-", font_size=22, color=BLACK)
+        electron_label = cached_text("-", font_size=22, color=BLACK)
         electron_label.move_to(electron.get_center())
 
         atom = Group(
@@ -112,8 +122,8 @@ class RubidiumLaserTrap(Scene):
             stroke_width=4,
             color=WHITE
         )
-        label1 = Text("E1", font_size=22).next_to(level1, LEFT, buff=0.3)
-        label2 = Text("E2", font_size=22).next_to(level2, LEFT, buff=0.3)
+        label1 = cached_text("E1", font_size=22).next_to(level1, LEFT, buff=0.3)
+        label2 = cached_text("E2", font_size=22).next_to(level2, LEFT, buff=0.3)
 
         self.play(Create(level1), Create(level2))
         self.play(FadeIn(label1), FadeIn(label2))
@@ -122,8 +132,8 @@ class RubidiumLaserTrap(Scene):
         # Qubit basis states
         # -----------------------------
         self.wait(1)
-        ket0 = Text("|0⟩", font_size=26).next_to(level1, RIGHT, buff=0.4)
-        ket1 = Text("|1⟩", font_size=26).next_to(level2, RIGHT, buff=0.4)
+        ket0 = cached_text("|0⟩", font_size=26).next_to(level1, RIGHT, buff=0.4)
+        ket1 = cached_text("|1⟩", font_size=26).next_to(level2, RIGHT, buff=0.4)
         self.play(FadeIn(ket0), FadeIn(ket1))
         self.wait(2)
 
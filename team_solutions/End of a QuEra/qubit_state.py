@@ -0,0 +1,108 @@
+import numpy as np
+import os
+
+WIZARD_COLORS = ("blue", "green", "orange", "pink", "purple", "yellow")
+COLOR_IDS = {name: i for i, name in enumerate(WIZARD_COLORS)}
+NO_COLOR = -1
+
+
+class QubitStateStore:
+    """
+    Array-backed wizard state for every qubit in a scene.
+
+    Columns:
+    - color_id:     index into WIZARD_COLORS (NO_COLOR until a sprite is set)
+    - level:        signed state level accumulated by single-qubit gates
+    - sprite_level: level of the sprite currently on screen (0/25/50/75/100)
+    - position:     (n, 3) scene coordinates of each wizard
+
+    All update methods take index arrays so a whole gate layer is updated in
+    one NumPy operation.
+    """
+
+    def __init__(self, n_qubits):
+        self.n_qubits = n_qubits
+        self.color_id = np.full(n_qubits, NO_COLOR, dtype=np.int8)
+        self.level = np.zeros(n_qubits, dtype=np.int16)
+        self.sprite_level = np.zeros(n_qubits, dtype=np.int16)
+        self.position = np.zeros((n_qubits, 3), dtype=np.float64)
+
+    def __len__(self):
+        return self.n_qubits
+
+    def state_arrays(self):
+        return {
+            "color_id": self.color_id,
+            "level": self.level,
+            "sprite_level": self.sprite_level,
+            "position": self.position,
+        }
+
+    def load_state_arrays(self, arrays):
+        for name, column in self.state_arrays().items():
+            column[:] = arrays[name]
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def color_name(self, qubit_index):
+        cid = self.color_id[qubit_index]
+        return None if cid == NO_COLOR else WIZARD_COLORS[cid]
+
+    def color_and_level(self, qubit_index):
+        """Returns (color name, sprite level), or (None, None) if no sprite is set."""
+        if self.color_id[qubit_index] == NO_COLOR:
+            return None, None
+        return self.color_name(qubit_index), int(self.sprite_level[qubit_index])
+
+    # -----------------------------
+    # Vectorized layer updates
+    # -----------------------------
+    def set_sprites(self, indices, colors, levels):
+        """Records the sprite shown for each qubit in `indices`."""
+        indices = np.asarray(indices, dtype=np.intp)
+        self.color_id[indices] = color_ids(colors, len(indices))
+        self.sprite_level[indices] = np.abs(levels)
+
+    def apply_level_deltas(self, indices, deltas):
+        """
+        Adds `deltas` to the signed level of each qubit, wrapping values outside
+        [-100, 100] back with `% 100`. Returns the new levels.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        levels = self.level[indices] + np.asarray(deltas, dtype=np.int16)
+        out_of_range = np.abs(levels) > 100
+        levels[out_of_range] = np.mod(levels[out_of_range], 100)
+        self.level[indices] = levels
+        return levels
+
+    def set_levels(self, indices, levels):
+        """Overwrites the level of each qubit (e.g. from simulated probabilities)."""
+        indices = np.asarray(indices, dtype=np.intp)
+        self.level[indices] = levels
+        return self.level[indices]
+
+    def set_positions(self, indices, positions):
+        self.position[np.asarray(indices, dtype=np.intp)] = positions
+
+
+def color_ids(colors, n):
+    """Converts a color name or list of names to an int8 array of length n."""
+    if isinstance(colors, str):
+        return np.full(n, COLOR_IDS[colors], dtype=np.int8)
+    return np.array([COLOR_IDS[c] for c in colors], dtype=np.int8)
+
+
+def parse_sprite_path(path):
+    """
+    Returns (color name, level) for a handdrawn_assets/<color>/<color>_<level>.png
+    path, or (None, None) if the file name does not follow that pattern.
+    """
+    parts = os.path.basename(str(path)).split("_")
+    if len(parts) != 2 or parts[0] not in COLOR_IDS:
+        return None, None
+    try:
+        level = int(parts[1].split(".")[0])  # remove file extension
+    except ValueError:
+        return None, None
+    return parts[0], level
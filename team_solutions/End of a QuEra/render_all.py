@@ -0,0 +1,296 @@
+"""
+Renders every Scene in a file in parallel and stitches them into one video.
+
+    python render_all.py "End of a QuEra Master Python Script.py" -o end_of_a_quera.mp4
+
+Scenes are found by parsing the file (classes whose base class name ends in
+"Scene"), so nothing is imported or rendered twice. Each scene renders in its
+own manim / manimgl process, up to one per CPU core, into its own media
+directory. The finished clips are joined with ffmpeg's concat demuxer in the
+order the classes are declared, copying streams instead of re-encoding.
+
+Each scene renders with the library its Scene base class comes from: files
+that import only one of manim / manimlib use it for every scene, and files
+that import both (the master script) are imported once in a child process to
+read each scene class's MRO. Use --backend to override it for every scene,
+or name a scene as Scene:backend to override just that one:
+
+    python render_all.py "End of a QuEra Master Python Script.py" \
+        -s RubidiumLaserTrap:manim QuantumCircuitScene ZonedQubitArchitecture
+
+With --segments N, long scenes are split too: a quick skip-animations pass
+counts each scene's play/wait calls, then N workers render consecutive
+animation ranges with the backends' `-n start,end` option. Each worker
+fast-forwards through the animations before its range without rasterizing,
+and the segments are joined losslessly like whole scenes.
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+QUALITY_FLAGS = {
+    "manim": {"low": ["-ql"], "medium": ["-qm"], "high": ["-qh"], "4k": ["-qk"]},
+    "manimgl": {"low": ["-l"], "medium": ["-m"], "high": ["--hd"], "4k": ["--uhd"]},
+}
+
+
+def discover_scenes(path):
+    """Scene subclasses defined in `path`, in declaration order."""
+    tree = ast.parse(open(path, encoding="utf-8").read(), filename=path)
+    scenes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for base in node.bases:
+            name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", "")
+            if name.endswith("Scene") or name in scenes:
+                scenes.append(node.name)
+                break
+    return scenes
+
+
+def detect_backend(path):
+    """"manimgl" or "manim" for a file importing one library, None if it imports both."""
+    tree = ast.parse(open(path, encoding="utf-8").read(), filename=path)
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module.split(".")[0])
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+    if "manimlib" in modules:
+        return None if "manim" in modules else "manimgl"
+    return "manim"
+
+
+def scene_backends(path, scenes):
+    """{scene: backend} for `scenes`, per scene class when the file mixes libraries."""
+    backend = detect_backend(path)
+    if backend is not None or not scenes:
+        return dict.fromkeys(scenes, backend)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--scene-backends", path, *scenes],
+        cwd=os.path.dirname(path), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import {path} to pick scene backends:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _scene_backends(path, *scenes):
+    """Imports `path` and prints each scene's backend, from its class's MRO, as JSON."""
+    # manimlib parses sys.argv when its config is imported
+    sys.argv = ["manimgl", path, "-s"]
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location("render_all_scenes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    backends = {}
+    for scene in scenes:
+        roots = {base.__module__.split(".")[0] for base in getattr(module, scene).__mro__}
+        backends[scene] = "manimgl" if "manimlib" in roots else "manim"
+    print(json.dumps(backends))
+
+
+def render_command(backend, path, scene, out_dir, quality, name=None, animations=None):
+    """
+    CLI call rendering `scene` to <name>.mp4; `animations` = (start, stop)
+    limits it to play/wait calls start..stop-1.
+    """
+    name = name or scene
+    if backend == "manimgl":
+        limit = ["-n", f"{animations[0]},{animations[1]}"] if animations else []
+        return [
+            sys.executable, "-m", "manimlib", path, scene, "-w",
+            "--video_dir", out_dir, "--file_name", name,
+            *QUALITY_FLAGS[backend][quality], *limit,
+        ]
+    # manim CE's upper bound is inclusive
+    limit = ["-n", f"{animations[0]},{animations[1] - 1}"] if animations else []
+    return [
+        sys.executable, "-m", "manim", "render", path, scene,
+        "--media_dir", out_dir, "-o", name,
+        *QUALITY_FLAGS[backend][quality], *limit,
+    ]
+
+
+def count_animations(backend, path, scene, work_dir):
+    """Number of play/wait calls in `scene`, from a run that skips every animation."""
+    out_dir = os.path.join(work_dir, scene, "count")
+    os.makedirs(out_dir, exist_ok=True)
+    count_path = os.path.join(out_dir, "count.txt")
+    with open(os.path.join(out_dir, "render.log"), "w") as log:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--count-plays",
+             backend, path, scene, out_dir, count_path],
+            cwd=os.path.dirname(path), stdout=log, stderr=subprocess.STDOUT, check=True,
+        )
+    with open(count_path) as f:
+        return int(f.read())
+
+
+def _count_plays(backend, path, scene, out_dir, count_path):
+    """Runs the backend CLI in-process with -s and records num_plays at tear_down."""
+    # manimlib parses sys.argv when its config is imported, so set it first
+    if backend == "manimgl":
+        sys.argv = ["manimgl", path, scene, "-s", "--video_dir", out_dir]
+        from manimlib import Scene
+        from manimlib.__main__ import main as cli
+        num_plays = lambda scene: scene.num_plays
+    else:
+        sys.argv = ["manim", "render", path, scene, "-s", "--media_dir", out_dir]
+        from manim import Scene
+        from manim.__main__ import main as cli
+        num_plays = lambda scene: scene.renderer.num_plays
+
+    tear_down = Scene.tear_down
+
+    def counting_tear_down(self):
+        with open(count_path, "w") as f:
+            f.write(str(num_plays(self)))
+        return tear_down(self)
+
+    Scene.tear_down = counting_tear_down
+    cli()
+
+
+def split_animations(n_animations, n_segments):
+    """Consecutive (start, stop) ranges covering 0..n_animations-1."""
+    bounds = np.linspace(0, n_animations, min(n_segments, n_animations) + 1).round().astype(int)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def find_video(out_dir, scene):
+    """The rendered clip for `scene` (the newest matching .mp4 under out_dir)."""
+    matches = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(out_dir)
+        for name in names
+        if name == f"{scene}.mp4"
+    ]
+    if not matches:
+        raise FileNotFoundError(f"No {scene}.mp4 under {out_dir}")
+    return max(matches, key=os.path.getmtime)
+
+
+def render_scene(backend, path, scene, work_dir, quality, animations=None):
+    name = scene if animations is None else f"{scene}_{animations[0]:05d}"
+    out_dir = os.path.join(work_dir, scene, name)
+    os.makedirs(out_dir, exist_ok=True)
+    log_path = os.path.join(out_dir, "render.log")
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        result = subprocess.run(
+            render_command(backend, path, scene, out_dir, quality, name, animations),
+            cwd=os.path.dirname(os.path.abspath(path)),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed (exit {result.returncode}), see {log_path}")
+    return find_video(out_dir, name), time.perf_counter() - start
+
+
+def concat_videos(videos, output, reencode=False):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for video in videos:
+            escaped = os.path.abspath(video).replace("'", r"'\''")
+            listing.write(f"file '{escaped}'\n")
+    codec = ["-c:v", "libx264", "-pix_fmt", "yuv420p"] if reencode else ["-c", "copy"]
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", listing.name, *codec, output],
+            check=True,
+        )
+    finally:
+        os.remove(listing.name)
+
+
+def render_all(path, output, scenes=None, backend=None, quality="low", jobs=None,
+               work_dir=None, reencode=False, segments=1):
+    path = os.path.abspath(path)
+    scenes = scenes or discover_scenes(path)
+    explicit = [s.partition(":")[2] for s in scenes]
+    scenes = [s.partition(":")[0] for s in scenes]
+    detected = {} if backend else scene_backends(
+        path, [scene for scene, b in zip(scenes, explicit) if not b]
+    )
+    backends = [b or backend or detected[scene] for scene, b in zip(scenes, explicit)]
+    work_dir = work_dir or os.path.join(os.path.dirname(path), "media", "render_all")
+    jobs = jobs or os.cpu_count() or 1
+
+    # Threads only wait on the render processes, which do the actual work
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        if segments > 1:
+            counts = list(pool.map(
+                lambda sb: count_animations(sb[1], path, sb[0], work_dir),
+                zip(scenes, backends),
+            ))
+            ranges = [split_animations(n, segments) for n in counts]
+        else:
+            ranges = [[None] for _ in scenes]
+        tasks = [
+            (scene, b, animations)
+            for scene, b, scene_ranges in zip(scenes, backends, ranges)
+            for animations in scene_ranges
+        ]
+        futures = [
+            pool.submit(render_scene, b, path, scene, work_dir, quality, animations)
+            for scene, b, animations in tasks
+        ]
+        results = [future.result() for future in futures]
+
+    for (scene, _, animations), (video, seconds) in zip(tasks, results):
+        label = scene if animations is None else f"{scene}[{animations[0]}:{animations[1]}]"
+        print(f"{label:<36} {seconds:7.1f}s  {video}")
+    concat_videos([video for video, _ in results], output, reencode)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("file", help="Python file containing the scenes")
+    parser.add_argument("-o", "--output", default="final.mp4")
+    parser.add_argument("-s", "--scenes", nargs="+",
+                        help="Scenes to render, optionally as Scene:backend (default: all, in file order)")
+    parser.add_argument("-b", "--backend", choices=sorted(QUALITY_FLAGS))
+    parser.add_argument("-q", "--quality", choices=["low", "medium", "high", "4k"], default="low")
+    parser.add_argument("-j", "--jobs", type=int, help="Parallel renders (default: CPU count)")
+    parser.add_argument("--work-dir", help="Where per-scene media and logs go")
+    parser.add_argument("--reencode", action="store_true",
+                        help="Re-encode when joining (clips with different resolution / fps)")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="Split each scene into this many animation ranges rendered in parallel")
+    parser.add_argument("--profile", choices=["draft", "review", "final"],
+                        help="Timing profile for every scene (sets QUERA_TIMING, see assets/timing.py)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        os.environ["QUERA_TIMING"] = args.profile
+
+    if args.scenes is None and not discover_scenes(args.file):
+        parser.error(f"No Scene subclasses found in {args.file}")
+    render_all(
+        args.file, args.output, args.scenes, args.backend, args.quality,
+        args.jobs, args.work_dir, args.reencode, args.segments,
+    )
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--count-plays"]:
+        _count_plays(*sys.argv[2:])
+    elif sys.argv[1:2] == ["--scene-backends"]:
+        _scene_backends(*sys.argv[2:])
+    else:
+        main()
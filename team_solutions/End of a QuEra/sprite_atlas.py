@@ -0,0 +1,191 @@
+"""
+Offline sprite atlas for handdrawn_assets.
+
+Packs every PNG under handdrawn_assets into one RGBA texture plus a JSON index
+of sub-rectangles, so scenes hold a single texture instead of one per wizard.
+
+There is one atlas per mip level (see sprite_mipmaps.py); `source_sizes` in
+each index records the full-resolution size of every sprite. Every level
+shares one layout: cells are packed once in level-0 pixels, aligned to the
+coarsest level, and each level divides their offsets (and the gutter) by its
+scale. A sprite therefore has the same UV rect on every level, so a Transform
+between mobjects built on different levels samples the same cell throughout.
+
+Build (or rebuild) every level with:
+    python sprite_atlas.py
+"""
+from PIL import Image
+import numpy as np
+import json
+import os
+
+from sprite_mipmaps import (
+    ASSET_DIR,
+    MAX_MIP_LEVEL,
+    MIP_ALIGN,
+    ensure_mipmaps,
+    find_sprites,
+    mip_path,
+)
+
+ATLAS_DIR = os.path.join(ASSET_DIR, "atlas")
+
+MAX_ATLAS_WIDTH = 4096
+PADDING = 2  # transparent gutter, in pixels of the coarsest level, so linear filtering never bleeds between sprites
+
+
+def sprite_name(path):
+    """'handdrawn_assets/blue/blue_0.png' -> 'blue/blue_0'."""
+    rel = os.path.relpath(path, ASSET_DIR)
+    return os.path.splitext(rel)[0].replace(os.sep, "/")
+
+
+def atlas_paths(level=0):
+    """(image path, index path) of the atlas for one mip level."""
+    stem = os.path.join(ATLAS_DIR, f"atlas_{level}")
+    return stem + ".png", stem + ".json"
+
+
+# -----------------------------
+# Packing
+# -----------------------------
+def pack_shelves(sizes, max_width=MAX_ATLAS_WIDTH, padding=PADDING):
+    """
+    Shelf packing: sprites sorted by height are laid out left to right in rows.
+    Returns (rects, atlas_width, atlas_height) with rects as an (n, 4) array of
+    x, y, w, h in the input order.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+    rects = np.zeros((len(sizes), 4), dtype=np.int64)
+    rects[:, 2:] = sizes
+
+    x = y = shelf_height = atlas_width = 0
+    for i in np.argsort(-sizes[:, 1], kind="stable"):
+        w, h = sizes[i]
+        if x > 0 and x + w + padding > max_width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        rects[i, :2] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        atlas_width = max(atlas_width, x)
+    return rects, int(atlas_width), int(y + shelf_height)
+
+
+def shared_layout(source_sizes):
+    """
+    Level-0 cells (x, y, w, h) for every sprite plus the atlas size, with
+    every offset and size a multiple of MIP_ALIGN so each level can divide
+    them exactly.
+    """
+    sizes = -(-np.asarray(source_sizes, dtype=np.int64).reshape(-1, 2) // MIP_ALIGN) * MIP_ALIGN
+    return pack_shelves(sizes, padding=PADDING * MIP_ALIGN)
+
+
+def build_atlas(level=0):
+    if level > 0:
+        ensure_mipmaps()
+    image_path, index_path = atlas_paths(level)
+    paths = find_sprites()
+    source_sizes = [Image.open(p).size for p in paths]
+    images = [Image.open(mip_path(p, level)).convert("RGBA") for p in paths]
+    cells, width, height = shared_layout(source_sizes)
+    scale = 2 ** level
+    rects = np.column_stack([cells[:, :2] // scale, [im.size for im in images]])
+    width, height = width // scale, height // scale
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for im, (x, y, _, _) in zip(images, rects):
+        atlas.paste(im, (int(x), int(y)))
+
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    atlas.save(image_path)
+    with open(index_path, "w") as f:
+        json.dump(
+            {
+                "level": level,
+                "size": [width, height],
+                "names": [sprite_name(p) for p in paths],
+                "rects": rects.tolist(),
+                "source_sizes": source_sizes,
+            },
+            f,
+            indent=1,
+        )
+    return SpriteAtlas(image_path, index_path)
+
+
+def atlas_stale(level=0):
+    _, index_path = atlas_paths(level)
+    if not os.path.exists(index_path):
+        return True
+    built = os.path.getmtime(index_path)
+    # Rebuild when the packing code changes too, not just the sprites
+    return any(os.path.getmtime(p) > built for p in [os.path.abspath(__file__), *find_sprites()])
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+class SpriteAtlas:
+    def __init__(self, image_path, index_path):
+        self.image_path = image_path
+        with open(index_path) as f:
+            index = json.load(f)
+        self.level = index["level"]
+        self.size = tuple(index["size"])
+        self.names = index["names"]
+        self.rects = np.array(index["rects"], dtype=np.int64).reshape(-1, 4)
+        self.source_sizes = np.array(index["source_sizes"], dtype=np.int64).reshape(-1, 2)
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+        self._pixels = None
+
+    def __contains__(self, name):
+        return name in self.name_to_id
+
+    def rect(self, name):
+        """(x, y, w, h) of a sprite in atlas pixels."""
+        return tuple(int(v) for v in self.rects[self.name_to_id[name]])
+
+    def source_size(self, name):
+        """(w, h) of the full-resolution sprite this one was built from."""
+        return tuple(int(v) for v in self.source_sizes[self.name_to_id[name]])
+
+    def uv_rect(self, name):
+        """
+        (u0, v0, u1, v1) of a sprite in normalized texture coordinates. Taken
+        from the full-resolution size rather than the (rounded down) mip
+        size, so it is identical on every level.
+        """
+        x, y, _, _ = self.rect(name)
+        w, h = np.asarray(self.source_size(name)) / 2 ** self.level
+        aw, ah = self.size
+        return x / aw, y / ah, (x + w) / aw, (y + h) / ah
+
+    @property
+    def pixels(self):
+        """The decoded (height, width, 4) atlas, loaded once and shared."""
+        if self._pixels is None:
+            self._pixels = np.asarray(Image.open(self.image_path).convert("RGBA"))
+        return self._pixels
+
+    def sprite_pixels(self, name):
+        """A read-only view into the shared atlas for one sprite."""
+        x, y, w, h = self.rect(name)
+        return self.pixels[y:y + h, x:x + w]
+
+
+_ATLASES = {}
+
+
+def load_atlas(level=0):
+    """Returns the process-wide atlas for a mip level, building it if missing or stale."""
+    if level not in _ATLASES:
+        _ATLASES[level] = build_atlas(level) if atlas_stale(level) else SpriteAtlas(*atlas_paths(level))
+    return _ATLASES[level]
+
+
+if __name__ == "__main__":
+    for level in range(MAX_MIP_LEVEL + 1):
+        atlas = build_atlas(level)
+        print(f"Packed {len(atlas.names)} sprites into {atlas.size[0]}x{atlas.size[1]} {atlas.image_path}")
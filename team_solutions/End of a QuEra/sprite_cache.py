@@ -0,0 +1,123 @@
+from manimlib import ImageMobject
+from collections import OrderedDict, namedtuple
+from PIL import Image
+import os
+
+from sprite_mipmaps import ASSET_DIR, choose_mip_level, ensure_mipmaps, mip_path
+
+SPRITE_PATH_TEMPLATE = os.path.join(ASSET_DIR, "{color}", "{color}_{level}.png")
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "entries", "current_bytes", "max_bytes"]
+)
+
+
+class SpriteCache:
+    """
+    Process-wide cache of decoded wizard sprites keyed by (color, level, scale)
+    plus the mip level picked for the active quality preset.
+
+    Each entry holds one template ImageMobject sharing the decoded RGBA buffer
+    of its image path (several scales of a sprite share one). `get` hands out
+    `template.copy()`, which is cheap in manimlib (the PIL image is shared by
+    reference); manimlib itself caches one texture per image path. Least
+    recently used entries are evicted once the decoded pixels, counted once
+    per path, exceed `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, path_template=SPRITE_PATH_TEMPLATE):
+        self.max_bytes = max_bytes
+        self.path_template = path_template
+        self.entries = OrderedDict()  # key -> (template, image_path)
+        self.decoded = {}  # image_path -> decoded RGBA PIL image
+        self.source_heights = {}  # full-resolution path -> pixel height
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    def get(self, color, level, scale=0.5, frame_height=None):
+        source_path = self.path_template.format(color=color, level=int(level))
+        mip_level = self.mip_level(source_path, scale, frame_height)
+        key = (color, int(level), float(scale), mip_level)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0].copy()
+
+        self.misses += 1
+        # ImageMobject height does not depend on pixel size, so any mip level
+        # lands at the same on-screen size
+        template = ImageMobject(mip_path(source_path, mip_level))
+        template.scale(scale)
+        image_path = str(template.image_path)
+        template.image = self.decode(image_path)  # share the decoded buffer with every clone
+        self.entries[key] = (template, image_path)
+        self.evict()
+        return template.copy()
+
+    def mip_level(self, source_path, scale, frame_height=None):
+        if source_path not in self.source_heights:
+            self.source_heights[source_path] = Image.open(source_path).height
+        level = choose_mip_level(
+            self.source_heights[source_path], 4.0 * scale, frame_height
+        )
+        if level > 0:
+            ensure_mipmaps()
+        return level
+
+    def decode(self, image_path):
+        image = self.decoded.get(image_path)
+        if image is None:
+            image = Image.open(image_path).convert("RGBA")
+            self.decoded[image_path] = image
+            self.current_bytes += image.width * image.height * 4
+        return image
+
+    # -----------------------------
+    # Eviction
+    # -----------------------------
+    def evict(self):
+        # Always keep the newest entry, even if it alone is over budget
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, image_path) = self.entries.popitem(last=False)
+            self.evictions += 1
+            if not any(path == image_path for _, path in self.entries.values()):
+                # Live clones keep their own reference, so only forget it here
+                image = self.decoded.pop(image_path)
+                self.current_bytes -= image.width * image.height * 4
+
+    def clear(self):
+        self.entries.clear()
+        self.decoded.clear()
+        self.current_bytes = 0
+
+    def info(self):
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.evictions,
+            len(self.entries),
+            self.current_bytes,
+            self.max_bytes,
+        )
+
+
+SPRITE_CACHE = SpriteCache()
+
+
+def get_wizard_sprite(color, level, scale=0.5, frame_height=None):
+    """
+    Returns a cached copy of handdrawn_assets/<color>/<color>_<level>.png, at the
+    smallest mip level that is sharp for a camera frame of `frame_height`.
+    """
+    return SPRITE_CACHE.get(color, level, scale, frame_height)
+
+
+def sprite_cache_info():
+    return SPRITE_CACHE.info()
+
@@ -0,0 +1,112 @@
+"""
+Downsampled mip levels of handdrawn_assets for low-quality renders.
+
+Level k is every sprite shrunk by 2**k, stored under handdrawn_assets/mips/<k>/
+with the same relative paths as the originals (level 0). Loaders call
+`choose_mip_level` with the size a sprite will have on screen and get the
+smallest level that still covers it at the active quality preset, so
+`-ql` previews never decode or scale full-resolution PNGs.
+
+Build (or rebuild) with:
+    python sprite_mipmaps.py
+"""
+from PIL import Image
+import sys
+import os
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "handdrawn_assets")
+MIP_DIR = os.path.join(ASSET_DIR, "mips")
+GENERATED_DIRS = ("atlas", "mips")  # outputs that live inside ASSET_DIR
+MAX_MIP_LEVEL = 4
+MIP_ALIGN = 2 ** MAX_MIP_LEVEL  # level-0 pixels per pixel of the coarsest level
+
+
+def find_sprites(asset_dir=ASSET_DIR):
+    paths = []
+    for root, dirs, files in os.walk(asset_dir):
+        if root == ASSET_DIR:
+            dirs[:] = [d for d in dirs if d not in GENERATED_DIRS]
+        dirs.sort()
+        paths.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".png"))
+    return paths
+
+
+def mip_dir(level):
+    return ASSET_DIR if level == 0 else os.path.join(MIP_DIR, str(level))
+
+
+def mip_path(path, level):
+    """The level-k variant of an original asset path."""
+    if level == 0:
+        return path
+    return os.path.join(mip_dir(level), os.path.relpath(os.path.abspath(path), ASSET_DIR))
+
+
+# -----------------------------
+# Preprocessing
+# -----------------------------
+def build_mipmaps(max_level=MAX_MIP_LEVEL):
+    for path in find_sprites():
+        image = Image.open(path).convert("RGBA")
+        for level in range(1, max_level + 1):
+            w, h = image.size
+            image = image.resize((max(1, w // 2), max(1, h // 2)), Image.LANCZOS)
+            out = mip_path(path, level)
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+            image.save(out)
+
+
+def mipmaps_stale(max_level=MAX_MIP_LEVEL):
+    for path in find_sprites():
+        out = mip_path(path, max_level)
+        if not os.path.exists(out) or os.path.getmtime(path) > os.path.getmtime(out):
+            return True
+    return False
+
+
+_mipmaps_checked = False
+
+
+def ensure_mipmaps():
+    global _mipmaps_checked
+    if not _mipmaps_checked:
+        if mipmaps_stale():
+            build_mipmaps()
+        _mipmaps_checked = True
+
+
+# -----------------------------
+# Level selection
+# -----------------------------
+def pixels_per_unit(frame_height=None):
+    """Output pixels per scene unit for the active backend's quality preset."""
+    if "manimlib" in sys.modules:
+        from manimlib.config import manim_config
+
+        pixel_height = manim_config.camera.resolution[1]
+        frame_height = frame_height or manim_config.sizes.frame_height
+    else:
+        from manim import config
+
+        pixel_height = config.pixel_height
+        frame_height = frame_height or config.frame_height
+    return pixel_height / frame_height
+
+
+def choose_mip_level(source_pixels, world_size, frame_height=None):
+    """
+    Smallest mip level whose size along one axis is still at least the number
+    of screen pixels `world_size` scene units cover. `frame_height` is the
+    height of the camera frame the sprite is seen through (defaults to the
+    unzoomed frame).
+    """
+    needed = world_size * pixels_per_unit(frame_height)
+    level = 0
+    while level < MAX_MIP_LEVEL and source_pixels / 2 ** (level + 1) >= needed:
+        level += 1
+    return level
+
+
+if __name__ == "__main__":
+    build_mipmaps()
+    print(f"Built mip levels 1-{MAX_MIP_LEVEL} under {MIP_DIR}")
@@ -0,0 +1,66 @@
+"""
+Persistent cache of laid-out Text geometry, shared by every scene and run.
+
+`cached_text("Storage", font_size=28)` returns the same glyph outlines as
+`Text("Storage", font_size=28)`, but the outlines are read from
+.text_cache/<key>.npz once any earlier run has laid that text out. The key
+hashes the string, font size, every other layout argument (font, weight,
+slant, ...) and the backend with its version, since manim CE and manimlib
+produce different curves (cubic vs quadratic Béziers).
+
+Color and opacity are applied after loading, so they are not part of the key.
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+if "manimlib" in sys.modules:
+    import manimlib as backend
+    from manimlib import WHITE, Text, VGroup, VMobject
+
+    def _points(mobject):
+        return mobject.get_points()
+else:
+    import manim as backend
+    from manim import WHITE, Text, VGroup, VMobject
+
+    def _points(mobject):
+        return mobject.points
+
+
+TEXT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".text_cache")
+BACKEND = f"{backend.__name__}-{getattr(backend, '__version__', 'unknown')}"
+
+
+def text_key(text, font_size, **layout):
+    digest = hashlib.sha1(repr((BACKEND, text, font_size, sorted(layout.items()))).encode())
+    return digest.hexdigest()[:20]
+
+
+class CachedText(VGroup):
+    """Glyph outlines of a Text, rebuilt from cached point arrays."""
+
+    def __init__(self, text, glyph_points, color=WHITE, **kwargs):
+        super().__init__(*[VMobject().set_points(points) for points in glyph_points], **kwargs)
+        self.text = text
+        self.set_fill(color, opacity=1)
+        self.set_stroke(width=0)
+
+
+def cached_text(text, font_size=48, color=WHITE, **layout):
+    """Drop-in for Text(text, font_size=..., color=..., **layout)."""
+    path = os.path.join(TEXT_CACHE_DIR, text_key(text, font_size, **layout) + ".npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            glyphs = [data[f"glyph_{i}"] for i in range(len(data.files))]
+        return CachedText(text, glyphs, color=color)
+
+    laid_out = Text(text, font_size=font_size, **layout)
+    glyphs = [_points(m) for m in laid_out.family_members_with_points()]
+    os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+    tmp_path = path + f".{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, **{f"glyph_{i}": points for i, points in enumerate(glyphs)})
+    os.replace(tmp_path, path)  # atomic, so parallel renders never see half a file
+    return CachedText(text, glyphs, color=color)
@@ -0,0 +1,142 @@
+"""
+Batched spell effects for the wizard scenes (manimlib).
+
+A layer's effects are held in one mobject each and animated with a single
+UpdateFromAlphaFunc, instead of one mobject and one animation per spark or line,
+so their per-frame cost barely grows with the number of qubits in a layer.
+
+- SparkBurst: every gate spark of a layer in one DotCloud
+- SpellCurves: every spell line of a layer as subpaths of one VMobject
+- follow_paths: moves every mobject of a group along its own polyline
+"""
+import numpy as np
+from manimlib import BLUE, YELLOW, DotCloud, UpdateFromAlphaFunc, VMobject, interpolate_color
+
+
+class SparkBurst(DotCloud):
+    """
+    `sparks_per_center` dots scattered uniformly within `spread` of each
+    center. Animating alpha from 0 to 1 grows every spark by `grow` while
+    fading it out; with rate_func=there_and_back the sparks flash and return.
+    """
+
+    def __init__(
+        self,
+        centers,
+        sparks_per_center=6,
+        spread=0.15,
+        radius=0.05,
+        color=YELLOW,
+        grow=2.0,
+        rng=None,
+        **kwargs,
+    ):
+        rng = np.random.default_rng() if rng is None else rng
+        centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        offsets = np.zeros((len(centers), sparks_per_center, 3))
+        offsets[..., :2] = rng.uniform(-spread, spread, (len(centers), sparks_per_center, 2))
+        super().__init__(
+            (centers[:, None] + offsets).reshape(-1, 3), color=color, radius=radius, **kwargs
+        )
+        self.base_radius = radius
+        self.grow = grow
+
+    def set_burst(self, alpha):
+        """Sets every spark to `alpha` of the way through the burst at once."""
+        self.set_radius(self.base_radius * (1 + (self.grow - 1) * alpha))
+        self.set_opacity(1 - alpha)
+        return self
+
+    def burst(self, **kwargs):
+        return UpdateFromAlphaFunc(self, lambda mob, alpha: mob.set_burst(alpha), **kwargs)
+
+
+class SpellCurves(VMobject):
+    """
+    One wavy spell line from each start to the matching end, all computed in
+    a single broadcast and stored as subpaths of one VMobject. pulse()
+    recolors the lines and grows each about its own center; fade() dims them.
+    """
+
+    def __init__(
+        self,
+        starts,
+        ends,
+        num_points=20,
+        amplitude=0.1,
+        wave_count=5,
+        color=BLUE,
+        pulse_color=YELLOW,
+        pulse_scale=1.2,
+        fade_opacity=0.2,
+        stroke_width=3,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+        t = np.linspace(0, 1, num_points)
+        anchors = starts[:, None] + (ends - starts)[:, None] * t[:, None]
+        anchors[..., 1] += amplitude * np.sin(2 * wave_count * np.pi * t)
+
+        # Each line is anchor, handle, anchor, ..., anchor; a handle sitting on
+        # the last anchor ends the subpath before the next line starts
+        blocks = np.empty((len(anchors), 2 * num_points, 3))
+        blocks[:, 0:-1:2] = anchors
+        blocks[:, 1:-1:2] = 0.5 * (anchors[:, :-1] + anchors[:, 1:])
+        blocks[:, -1] = anchors[:, -1]
+        centers = 0.5 * (anchors.min(axis=1) + anchors.max(axis=1))
+        self.base_points = blocks.reshape(-1, 3)[:-1]
+        self.base_centers = np.repeat(centers, 2 * num_points, axis=0)[:-1]
+
+        self.spell_color = color
+        self.pulse_color = pulse_color
+        self.pulse_scale = pulse_scale
+        self.fade_opacity = fade_opacity
+        self.set_points(self.base_points)
+        self.set_fill(opacity=0)
+        self.set_stroke(color=color, width=stroke_width, opacity=1)
+
+    def set_pulse(self, alpha):
+        scale = 1 + (self.pulse_scale - 1) * alpha
+        self.set_points(self.base_centers + scale * (self.base_points - self.base_centers))
+        self.set_stroke(color=interpolate_color(self.spell_color, self.pulse_color, alpha))
+        return self
+
+    def set_fade(self, alpha):
+        self.set_stroke(opacity=1 + (self.fade_opacity - 1) * alpha)
+        return self
+
+    def pulse(self, **kwargs):
+        return UpdateFromAlphaFunc(self, lambda mob, alpha: mob.set_pulse(alpha), **kwargs)
+
+    def fade(self, **kwargs):
+        return UpdateFromAlphaFunc(self, lambda mob, alpha: mob.set_fade(alpha), **kwargs)
+
+
+def polyline_points(paths, alpha):
+    """
+    The point `alpha` of the way along each polyline of `paths`, an
+    (N, K, 3) array of K waypoints per path, giving each segment equal time.
+    """
+    n_segments = paths.shape[1] - 1
+    x = np.clip(alpha, 0, 1) * n_segments
+    i = min(int(x), n_segments - 1)
+    return paths[:, i] + (x - i) * (paths[:, i + 1] - paths[:, i])
+
+
+def follow_paths(group, paths, **kwargs):
+    """
+    Moves group.submobjects[n] through the waypoints paths[n] in one
+    animation, interpolating all positions with one array operation per frame.
+    """
+    paths = np.asarray(paths, dtype=float)
+    n = len(group.submobjects)
+    if paths.ndim != 3 or paths.shape[0] != n or paths.shape[2] != 3:
+        raise ValueError(f"Expected paths of shape ({n}, K, 3), got {paths.shape}")
+
+    def update(group, alpha):
+        for mob, point in zip(group.submobjects, polyline_points(paths, alpha)):
+            mob.move_to(point)
+
+    return UpdateFromAlphaFunc(group, update, **kwargs)